@@ -25,18 +25,18 @@ HOW TO USE IN COLAB:
   6. Cell 5: Final summary + upload checklist
 
 USAGE (single command):
-  !pip install -q xgboost lightgbm statsmodels beautifulsoup4
+  !pip install -q xgboost lightgbm beautifulsoup4 numba numexpr orjson rapidfuzz polars
   !python BracketGPT_Unified_Pipeline.py \\
     --data-dir "/content/drive/MyDrive/march madness/data" \\
     --kenpom-path "/content/drive/MyDrive/march madness/outputs/kenpom_master.csv" \\
     --output-dir "/content/drive/MyDrive/march madness/outputs" \\
     --backtest 2025
+  JSON is written compact; set BRACKETGPT_PRETTY_JSON=1 for indented output.
 """
 
-import os, gc, json, warnings, argparse, time
-from collections import defaultdict
+import os, json, math, hashlib, shutil, warnings, argparse, time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 from difflib import SequenceMatcher
 
@@ -59,22 +59,53 @@ except ImportError:
     print("⚠️ LightGBM not found. Using RF fallback.")
 
 try:
-    import statsmodels.api as sm
+    from numba import njit
+    HAS_NUMBA = True
 except ImportError:
-    pass
+    HAS_NUMBA = False
 
-from scipy.stats import norm
-from sklearn.linear_model import LogisticRegression
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics import brier_score_loss, log_loss, accuracy_score
-from sklearn.cluster import KMeans
+    def njit(*args, **kwargs):
+        """No-op stand-in so kernels still run (slowly) without Numba."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
+
+try:
+    import numexpr as ne
+    HAS_NUMEXPR = True
+except ImportError:
+    HAS_NUMEXPR = False
+
+try:
+    import pyarrow  # noqa: F401  (pandas' multithreaded CSV engine + parquet)
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+try:
+    import polars as pl
+    HAS_POLARS = True
+except ImportError:
+    HAS_POLARS = False
+
+try:
+    from rapidfuzz import fuzz, process as fuzz_process
+    HAS_RAPIDFUZZ = True
+except ImportError:
+    HAS_RAPIDFUZZ = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
-warnings.filterwarnings("ignore")
 np.random.seed(42)
 
 HEADERS = {"User-Agent": "Mozilla/5.0 (BracketGPT/2.0 research)"}
+# One keep-alive session for every Step 2 fetch
+HTTP_SESSION = requests.Session()
+HTTP_SESSION.headers.update(HEADERS)
 KENPOM_NAME_MAP = {}
 
 
@@ -86,6 +117,9 @@ class Config:
     OUTPUT_DIR = Path("./outputs")
     KENPOM_PATH = None
     KENPOM_NAME_MAP_PATH = Path("./data/kenpom_name_map.json")
+    CACHE_DIR = None  # set from --output-dir in main(); None disables caching
+    # Indented JSON is for reading by hand; the server only needs compact output
+    PRETTY_JSON = os.environ.get('BRACKETGPT_PRETTY_JSON') == '1'
     MIN_SEASON = 2003
     BACKTEST_SEASON = 2025
 
@@ -98,14 +132,21 @@ class Config:
         'min_child_weight': 40,
         'max_depth': 4,
         'gamma': 10,
+        'tree_method': 'hist',
+        'nthread': -1,
     }
     XGB_ROUNDS = 250
+    DEVICE = 'cpu'  # XGBoost: 'cpu' or 'cuda'; set from --device in main()
+    LGB_DEVICE = 'cpu'  # LightGBM: 'cpu' or 'gpu' (OpenCL), probed separately
+    SKIP_TRAINING = False  # --skip-training: reuse the boosters saved in OUTPUT_DIR
 
     ELO_BASE = 1000
     ELO_WIDTH = 400
     ELO_K = 100
     ELO_DECAY = 0.33
 
+    PYTH_EXPONENT = 8.0
+
     SIGMA = 11.0
     ESPN_SCORING = {1: 10, 2: 20, 3: 40, 4: 80, 5: 160, 6: 320}
 
@@ -135,24 +176,73 @@ class Config:
     ]
 
 
+def build_seed_implied_table(win_rates: dict) -> np.ndarray:
+    """(17, 17) table of P(row seed beats column seed), both orientations filled."""
+    table = np.full((17, 17), 0.5)
+    for (fav, dog), prob in win_rates.items():
+        table[fav, dog] = prob
+        table[dog, fav] = 1 - prob
+    return table
+
+
+SEED_IMPLIED = build_seed_implied_table(Config.SEED_WIN_RATES)
+
+
 # =============================================================================
 # HELPERS
 # =============================================================================
 def prefix_rename(df: pd.DataFrame, prefix: str,
                   id_col: str = 'TeamID', keep_cols: list = None) -> pd.DataFrame:
-    """Rename team-level df for T1/T2 merge. Bulletproof."""
+    """Rename team-level df for T1/T2 merge. Bulletproof.
+
+    Only column labels change, so no data copy is made; the result is meant
+    to be merged, not mutated.
+    """
     if keep_cols is None:
         keep_cols = ['Season']
-    out = df.copy()
     rename_map = {}
-    for c in out.columns:
+    for c in df.columns:
         if c in keep_cols:
             continue
         elif c == id_col:
             rename_map[c] = f'{prefix}_TeamID'
         else:
             rename_map[c] = f'{prefix}_{c}'
-    return out.rename(columns=rename_map)
+    return df.rename(columns=rename_map)
+
+
+def fast_map(s: pd.Series, d: dict) -> pd.Series:
+    """Series.map over a dict, switching to per-element dict.get once the dict is large."""
+    return s.map(d) if len(d) < 10_000 else s.map(d.get)
+
+
+def add_diff_columns(td: pd.DataFrame, stats: list, fill: float = 0) -> pd.DataFrame:
+    """Add {stat}_diff = T1_{stat} - T2_{stat} for every stat present on both sides, in one block."""
+    stats = [st for st in stats if f'T1_{st}' in td.columns and f'T2_{st}' in td.columns]
+    if not stats:
+        return td
+    t1 = td[[f'T1_{st}' for st in stats]].fillna(fill).to_numpy()
+    t2 = td[[f'T2_{st}' for st in stats]].fillna(fill).to_numpy()
+    td[[f'{st}_diff' for st in stats]] = t1 - t2
+    return td
+
+
+def pythagorean_expectation(ppg, opp_ppg, exponent: float = None) -> np.ndarray:
+    """ppg^e / (ppg^e + opp^e), 0.5 where scoring is missing; numexpr-fused when available.
+
+    The numexpr path agrees with the numpy one only within floating-point
+    tolerance (a few ulps, ~1e-15), not bit-for-bit.
+    """
+    e = Config.PYTH_EXPONENT if exponent is None else float(exponent)
+    s = np.asarray(ppg, dtype=np.float64)
+    a = np.asarray(opp_ppg, dtype=np.float64)
+    if HAS_NUMEXPR:
+        pyth = ne.evaluate('s**e / (s**e + a**e)', local_dict={'s': s, 'a': a, 'e': e})
+    else:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            se = s ** e
+            pyth = se / (se + a ** e)
+    return np.where(s + a > 0, pyth, 0.5)
 
 
 def normalize_team_name(name: str) -> str:
@@ -173,7 +263,32 @@ def normalize_team_name(name: str) -> str:
 
 
 def fuzzy_name_score(a: str, b: str) -> int:
-    return int(round(100 * SequenceMatcher(None, normalize_team_name(a), normalize_team_name(b)).ratio()))
+    return fuzzy_norm_score(normalize_team_name(a), normalize_team_name(b))
+
+
+def fuzzy_norm_score(norm_a: str, norm_b: str) -> int:
+    """fuzzy_name_score for names already passed through normalize_team_name."""
+    return int(round(100 * SequenceMatcher(None, norm_a, norm_b).ratio()))
+
+
+def best_fuzzy_match(query_norm: str, choices_norm: list):
+    """(index, score) of the best-scoring normalized choice; first wins ties, (None, -1) if empty.
+
+    Scores are always difflib's. RapidFuzz's fuzz.ratio (LCS-based) is an upper
+    bound on SequenceMatcher.ratio(), so it only skips choices that cannot win.
+    """
+    if HAS_RAPIDFUZZ and choices_norm:
+        bounds = fuzz_process.cdist([query_norm], choices_norm, scorer=fuzz.ratio, processor=None)[0]
+    else:
+        bounds = None
+    best_idx, best_score = None, -1
+    for idx, choice in enumerate(choices_norm):
+        if bounds is not None and bounds[idx] < best_score:
+            continue
+        score = fuzzy_norm_score(query_norm, choice)
+        if score > best_score:
+            best_idx, best_score = idx, score
+    return best_idx, best_score
 
 
 def load_kenpom_name_map(path: Path) -> dict:
@@ -212,26 +327,26 @@ def resolve_kenpom_team_ids(kp: pd.DataFrame, teams: pd.DataFrame) -> pd.DataFra
 
     kaggle_names = teams[["TeamID", "TeamName"]].dropna().drop_duplicates("TeamID").copy()
     kaggle_names["norm_name"] = kaggle_names["TeamName"].map(normalize_team_name)
+    collisions = kaggle_names[kaggle_names["norm_name"].duplicated(keep=False)]
+    if not collisions.empty:
+        examples = ", ".join(sorted(collisions["TeamName"].astype(str))[:6])
+        print(f"⚠️ {collisions['norm_name'].nunique()} normalized Kaggle team names are shared by "
+              f"several TeamIDs (last one wins for exact matches): {examples}")
     kaggle_exact = {
         norm: (int(row.TeamID), str(row.TeamName))
         for row in kaggle_names.itertuples(index=False)
         for norm in [row.norm_name]
     }
 
-    # 1) Exact normalized match
-    unresolved_names = set()
-    for idx, row in kp.iterrows():
-        if pd.notna(row.get("TeamID")):
-            continue
-        raw_name = str(row.get(name_col, "")).strip()
-        if not raw_name:
-            continue
-        norm_name = normalize_team_name(raw_name)
-        exact = kaggle_exact.get(norm_name)
-        if exact:
-            kp.at[idx, "TeamID"] = exact[0]
-        else:
-            unresolved_names.add(raw_name)
+    # 1) Exact normalized match (normalize each distinct name once, then map)
+    raw_names = kp.loc[kp["TeamID"].isna(), name_col].map(str).str.strip()
+    raw_names = raw_names[raw_names != ""]
+    exact_ids = {norm: team_id for norm, (team_id, _) in kaggle_exact.items()}
+    norm_of = {name: normalize_team_name(name) for name in raw_names.unique()}
+    matched_ids = raw_names.map(norm_of).map(exact_ids)
+    hit = matched_ids.notna()
+    kp.loc[matched_ids.index[hit], "TeamID"] = matched_ids[hit]
+    unresolved_names = set(raw_names[~hit])
 
     if not unresolved_names:
         return kp
@@ -241,14 +356,14 @@ def resolve_kenpom_team_ids(kp: pd.DataFrame, teams: pd.DataFrame) -> pd.DataFra
     fuzzy_auto = {}
     fuzzy_review = []
     fuzzy_hard = []
-    kaggle_pool = kaggle_names[["TeamID", "TeamName"]].to_records(index=False)
+    pool_ids = kaggle_names["TeamID"].tolist()
+    pool_names = kaggle_names["TeamName"].tolist()
+    pool_norms = kaggle_names["norm_name"].tolist()
 
     for kenpom_name in sorted(unresolved_names):
-        best_id, best_name, best_score = None, None, -1
-        for team_id, team_name in kaggle_pool:
-            score = fuzzy_name_score(kenpom_name, team_name)
-            if score > best_score:
-                best_id, best_name, best_score = int(team_id), str(team_name), score
+        best_idx, best_score = best_fuzzy_match(norm_of[kenpom_name], pool_norms)
+        best_id, best_name = (None, None) if best_idx is None else (
+            int(pool_ids[best_idx]), str(pool_names[best_idx]))
 
         if best_score > 85:
             fuzzy_auto[kenpom_name] = (best_id, best_name, best_score)
@@ -258,9 +373,9 @@ def resolve_kenpom_team_ids(kp: pd.DataFrame, teams: pd.DataFrame) -> pd.DataFra
             fuzzy_hard.append((kenpom_name, best_name, best_score))
 
     if fuzzy_auto:
-        for k_name, (team_id, _, _) in fuzzy_auto.items():
-            mask = kp[name_col].astype(str).str.strip() == k_name
-            kp.loc[mask & kp["TeamID"].isna(), "TeamID"] = team_id
+        fuzzy_ids = fast_map(kp[name_col].astype(str).str.strip(),
+                             {k_name: team_id for k_name, (team_id, _, _) in fuzzy_auto.items()})
+        kp["TeamID"] = kp["TeamID"].fillna(fuzzy_ids)
         print("✅ Auto-applied fuzzy matches (>85):")
         for k_name, (_, best_name, score) in sorted(fuzzy_auto.items()):
             print(f"   {k_name} -> {best_name} [{score}]")
@@ -280,14 +395,12 @@ def resolve_kenpom_team_ids(kp: pd.DataFrame, teams: pd.DataFrame) -> pd.DataFra
     # 3) Apply manual/cache map after fuzzy pre-pass
     name_map = load_kenpom_name_map(Config.KENPOM_NAME_MAP_PATH)
     if name_map:
+        map_ids = {}
         for kenpom_name, kaggle_name in name_map.items():
-            norm_target = normalize_team_name(kaggle_name)
-            exact = kaggle_exact.get(norm_target)
-            if not exact:
-                continue
-            team_id = exact[0]
-            mask = kp[name_col].astype(str).str.strip() == str(kenpom_name).strip()
-            kp.loc[mask & kp["TeamID"].isna(), "TeamID"] = team_id
+            exact = kaggle_exact.get(normalize_team_name(kaggle_name))
+            if exact:
+                map_ids.setdefault(str(kenpom_name).strip(), exact[0])
+        kp["TeamID"] = kp["TeamID"].fillna(fast_map(kp[name_col].astype(str).str.strip(), map_ids))
 
     # 4) Cache confirmed fuzzy auto-matches for future runs
     if fuzzy_auto:
@@ -316,6 +429,23 @@ class NumpyEncoder(json.JSONEncoder):
         return super().default(obj)
 
 
+def write_json(path, data):
+    """Write data as JSON (indented if Config.PRETTY_JSON), via orjson when available."""
+    if HAS_ORJSON:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if Config.PRETTY_JSON:
+            option |= orjson.OPT_INDENT_2
+        Path(path).write_bytes(orjson.dumps(data, default=NumpyEncoder().default, option=option))
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2 if Config.PRETTY_JSON else None, cls=NumpyEncoder)
+
+
+def parse_json(raw: bytes):
+    """Parse JSON bytes (an HTTP response body or a saved output), via orjson when available."""
+    return orjson.loads(raw) if HAS_ORJSON else json.loads(raw)
+
+
 # =============================================================================
 # ARCHETYPE SYSTEM
 # =============================================================================
@@ -416,6 +546,12 @@ class ArchetypeEngine:
         'The Offense-Only': 'Good+ offense + Weak defense. Shootout merchant.',
     }
 
+    # Rank cut points matching get_tier/get_tempo (right-inclusive: rank 25 is Elite)
+    TIER_BINS = [-np.inf, 25, 75, 150, 250, np.inf]
+    TIER_LABELS = ['Elite', 'Good', 'Average', 'Below Average', 'Weak']
+    TEMPO_BINS = [-np.inf, 100, 250, np.inf]
+    TEMPO_LABELS = ['Fast', 'Medium', 'Slow']
+
     @staticmethod
     def get_tier(rank: float, thresholds: dict) -> str:
         if pd.isna(rank):
@@ -448,8 +584,11 @@ class ArchetypeEngine:
         def_tier = cls.get_tier(row.get(de_col, np.nan),
                                 {'elite': 25, 'good': 75, 'average': 150, 'below_avg': 250})
         tempo = cls.get_tempo(row.get(tempo_col, np.nan))
-        key = (off_tier, def_tier, tempo)
-        name = cls.ARCHETYPE_MAP.get(key)
+        return cls.archetype_name(off_tier, def_tier, tempo)
+
+    @classmethod
+    def archetype_name(cls, off_tier: str, def_tier: str, tempo: str) -> str:
+        name = cls.ARCHETYPE_MAP.get((off_tier, def_tier, tempo))
         if name:
             return name
         if 'Weak' in [off_tier, def_tier]:
@@ -461,35 +600,52 @@ class ArchetypeEngine:
                 return 'The Offense-Only'
         return 'The Unknown'
 
+    @classmethod
+    def build_archetype_lut(cls) -> np.ndarray:
+        """(off tier, def tier, tempo) label codes -> archetype name, every cell resolved."""
+        lut = np.empty((len(cls.TIER_LABELS), len(cls.TIER_LABELS), len(cls.TEMPO_LABELS)), dtype=object)
+        for i, off_tier in enumerate(cls.TIER_LABELS):
+            for j, def_tier in enumerate(cls.TIER_LABELS):
+                for k, tempo in enumerate(cls.TEMPO_LABELS):
+                    lut[i, j, k] = cls.archetype_name(off_tier, def_tier, tempo)
+        return lut
+
     @classmethod
     def assign_archetypes_to_df(cls, df, oe_col='RankAdjOE', de_col='RankAdjDE',
                                  tempo_col='RankAdjTempo'):
         out = df.copy()
-        out['Off_Tier'] = out[oe_col].apply(
-            lambda x: cls.get_tier(x, {'elite': 25, 'good': 75, 'average': 150, 'below_avg': 250}))
-        out['Def_Tier'] = out[de_col].apply(
-            lambda x: cls.get_tier(x, {'elite': 25, 'good': 75, 'average': 150, 'below_avg': 250}))
-        out['Tempo_Style'] = out[tempo_col].apply(cls.get_tempo)
-        out['Archetype'] = out.apply(
-            lambda r: cls.assign_archetype(r, oe_col, de_col, tempo_col), axis=1)
+        off = pd.cut(out[oe_col], cls.TIER_BINS, labels=cls.TIER_LABELS).fillna('Average')
+        dfn = pd.cut(out[de_col], cls.TIER_BINS, labels=cls.TIER_LABELS).fillna('Average')
+        tempo = pd.cut(out[tempo_col], cls.TEMPO_BINS, labels=cls.TEMPO_LABELS).fillna('Medium')
+        out['Off_Tier'], out['Def_Tier'], out['Tempo_Style'] = off, dfn, tempo
+        out['Archetype'] = cls.ARCHETYPE_LUT[off.cat.codes.to_numpy(),
+                                             dfn.cat.codes.to_numpy(),
+                                             tempo.cat.codes.to_numpy()]
         return out
 
     @staticmethod
     def build_matchup_matrix(tourney_df):
-        matrix = defaultdict(lambda: {'wins': 0, 'total': 0})
-        for _, row in tourney_df.iterrows():
-            a1 = row.get('T1_Archetype', 'The Unknown')
-            a2 = row.get('T2_Archetype', 'The Unknown')
-            won = row.get('T1_won', 0)
-            matrix[(a1, a2)]['total'] += 1
-            matrix[(a1, a2)]['wins'] += int(won)
-            matrix[(a2, a1)]['total'] += 1
-            matrix[(a2, a1)]['wins'] += int(1 - won)
-        result = {}
-        for key, val in matrix.items():
-            val['win_rate'] = val['wins'] / val['total'] if val['total'] > 0 else 0.5
-            result[f"{key[0]}__vs__{key[1]}"] = val
-        return result
+        if len(tourney_df) == 0:
+            return {}
+        n = len(tourney_df)
+        a1 = np.broadcast_to(np.asarray(tourney_df.get('T1_Archetype', 'The Unknown'), dtype=object), n)
+        a2 = np.broadcast_to(np.asarray(tourney_df.get('T2_Archetype', 'The Unknown'), dtype=object), n)
+        won = np.broadcast_to(np.asarray(tourney_df.get('T1_won', 0), dtype=np.int64), n)
+
+        # Each game counts once from each side; interleaving (a1, a2), (a2, a1) per game
+        # keeps keys in first-seen order, as the JSON output has always listed them
+        both = pd.DataFrame({
+            'A1': np.column_stack([a1, a2]).ravel(),
+            'A2': np.column_stack([a2, a1]).ravel(),
+            'win': np.column_stack([won, 1 - won]).ravel(),
+        })
+        g = both.groupby(['A1', 'A2'], sort=False, dropna=False)['win'].agg(wins='sum', total='size')
+        g['win_rate'] = g['wins'] / g['total']
+        g.index = [f"{k1}__vs__{k2}" for k1, k2 in g.index]
+        return g.to_dict('index')
+
+
+ArchetypeEngine.ARCHETYPE_LUT = ArchetypeEngine.build_archetype_lut()
 
 
 # #############################################################################
@@ -499,24 +655,104 @@ class ArchetypeEngine:
 # =============================================================================
 # DATA LOADING
 # =============================================================================
-def load_data(data_dir: Path):
+BOX_SCORE_STATS = ['FGM', 'FGA', 'FGM3', 'FGA3', 'FTM', 'FTA', 'OR', 'DR',
+                   'Ast', 'TO', 'Stl', 'Blk', 'PF']
+
+
+# Narrow dtypes for the Kaggle game/seed files; box-score counts fit in int16
+KAGGLE_DTYPES = {
+    'Season': 'int16', 'DayNum': 'int16', 'NumOT': 'int8',
+    'TeamID': 'int32', 'WTeamID': 'int32', 'LTeamID': 'int32',
+    'WScore': 'int16', 'LScore': 'int16', 'WLoc': 'category', 'Seed': 'category',
+    **{f'{side}{stat}': 'int16' for side in 'WL' for stat in BOX_SCORE_STATS},
+}
+
+
+# Columns the pipeline actually reads from each Kaggle file; everything else is skipped at parse
+KAGGLE_USECOLS = {
+    'MRegularSeasonDetailedResults': (['Season', 'DayNum', 'WTeamID', 'WScore', 'LTeamID', 'LScore']
+                                      + [f'{side}{stat}' for side in 'WL' for stat in BOX_SCORE_STATS]),
+    'MNCAATourneyDetailedResults': ['Season', 'DayNum', 'WTeamID', 'WScore', 'LTeamID', 'LScore'],
+    'MNCAATourneySeeds': ['Season', 'Seed', 'TeamID'],
+    'MTeams': ['TeamID', 'TeamName'],
+}
+
+
+def downcast_kaggle(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast known Kaggle columns to KAGGLE_DTYPES; columns with missing values keep their dtype."""
+    casts = {c: t for c, t in KAGGLE_DTYPES.items()
+             if c in df.columns and not df[c].isna().any()}
+    return df.astype(casts) if casts else df
+
+
+def read_kaggle_csv(path: Path) -> pd.DataFrame:
+    """Parse one Kaggle CSV (pyarrow engine when available), keeping only KAGGLE_USECOLS."""
+    wanted = KAGGLE_USECOLS.get(path.stem)
+    usecols = None
+    if wanted:
+        header = pd.read_csv(path, nrows=0).columns
+        usecols = [c for c in header if c in wanted]
+    df = pd.read_csv(path, usecols=usecols, engine='pyarrow' if HAS_PYARROW else 'c')
+    return downcast_kaggle(df)
+
+
+def read_csv_cached(path: Path, cache_dir=None) -> pd.DataFrame:
+    """read_kaggle_csv, memoized as typed parquet keyed on the CSV's size/mtime."""
+    if cache_dir is None:
+        return read_kaggle_csv(path)
+
+    st = path.stat()
+    sig = f"{st.st_size}-{st.st_mtime_ns}-{','.join(KAGGLE_USECOLS.get(path.stem, []))}"
+    key = hashlib.blake2b(sig.encode(), digest_size=8).hexdigest()
+    cache_path = Path(cache_dir) / f"{path.stem}_{key}.parquet"
+    if cache_path.exists():
+        try:
+            return pd.read_parquet(cache_path)
+        except Exception as exc:
+            print(f"⚠️ Ignoring unreadable CSV cache {cache_path.name}: {exc}")
+
+    df = read_kaggle_csv(path)
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(cache_path, index=False, compression='zstd')
+    except Exception as exc:
+        print(f"⚠️ Could not cache {path.name} as parquet: {exc}")
+    return df
+
+
+def load_data(data_dir: Path, cache_dir=None):
     print("📂 Loading Kaggle data...")
     t0 = time.time()
     data = {}
-    for f in data_dir.glob("*.csv"):
-        try:
-            data[f.stem] = pd.read_csv(f)
-        except Exception:
-            pass
+    # Kaggle CSVs with mixed-type columns are noisy; keep suppression local to IO
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)
+        warnings.simplefilter("ignore", pd.errors.DtypeWarning)
+        for stem in KAGGLE_USECOLS:
+            f = data_dir / f"{stem}.csv"
+            if not f.exists():
+                continue
+            try:
+                data[stem] = read_csv_cached(f, cache_dir)
+            except Exception:
+                pass
 
     M_regular = data.get('MRegularSeasonDetailedResults', pd.DataFrame())
     M_tourney = data.get('MNCAATourneyDetailedResults', pd.DataFrame())
+    if 'Season' in M_tourney.columns:
+        M_tourney = M_tourney.sort_values('Season', kind='stable', ignore_index=True)
     seeds = data.get('MNCAATourneySeeds', pd.DataFrame())
     teams = data.get('MTeams', pd.DataFrame())
 
     if not seeds.empty and 'Seed' in seeds.columns:
-        seeds['SeedNum'] = seeds['Seed'].str.extract(r'(\d+)').astype(int)
-        seeds['Region'] = seeds['Seed'].str.extract(r'([WXYZ])')
+        # Kaggle seeds are fixed-width: region letter, two digits, optional a/b.
+        # Parse the few distinct seed strings once and gather back by category code;
+        # missing seeds (code -1) stay NaN instead of wrapping to the last category.
+        seed_cat = seeds['Seed'].astype('category')
+        codes = seed_cat.cat.codes.to_numpy()
+        cats = seed_cat.cat.categories.astype(str)
+        seeds['SeedNum'] = pd.Series(cats.str.slice(1, 3).astype(int)).reindex(codes).to_numpy()
+        seeds['Region'] = pd.Series(cats.str.slice(0, 1)).reindex(codes).to_numpy()
 
     print(f"   Regular season: {len(M_regular):,} games")
     print(f"   Tournament:     {len(M_tourney):,} games")
@@ -538,84 +774,181 @@ def load_kenpom(kenpom_path, teams: pd.DataFrame = None):
     return None
 
 
+def get_kenpom(kenpom_path, teams: pd.DataFrame = None, cache_dir=None):
+    """load_kenpom with a parquet cache keyed on the KenPom CSV, Kaggle teams and name map."""
+    if cache_dir is None or not kenpom_path or not Path(kenpom_path).exists():
+        return load_kenpom(kenpom_path, teams)
+
+    st = Path(kenpom_path).stat()
+    digest = hashlib.blake2b(f"{st.st_size}-{st.st_mtime_ns}".encode(), digest_size=8)
+    if teams is not None:
+        digest.update(pd.util.hash_pandas_object(teams, index=False).to_numpy().tobytes())
+    # Hash map contents, not mtime: every run with fuzzy auto-matches rewrites the file
+    if Config.KENPOM_NAME_MAP_PATH.exists():
+        digest.update(Config.KENPOM_NAME_MAP_PATH.read_bytes())
+    path = Path(cache_dir) / f"kenpom_{digest.hexdigest()}.parquet"
+    if path.exists():
+        try:
+            kp = pd.read_parquet(path)
+            print(f"⚡ KenPom loaded from cache ({path.name}): {len(kp)} team-seasons")
+            return kp
+        except Exception as exc:
+            print(f"⚠️ Ignoring unreadable KenPom cache {path.name}: {exc}")
+
+    kp = load_kenpom(kenpom_path, teams)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        kp.to_parquet(path, index=False, compression='zstd')
+    except Exception as exc:
+        print(f"⚠️ Could not write KenPom cache to {path.parent}: {exc}")
+    return kp
+
+
 # =============================================================================
 # FEATURE ENGINEERING
 # =============================================================================
-def compute_elo(regular, backtest_season):
-    print("⚡ Computing Elo ratings...")
-    elo = defaultdict(lambda: Config.ELO_BASE)
-    season_elos = []
-
-    seasons = sorted(regular['Season'].unique())
-    for season in seasons:
-        if season >= backtest_season:
-            break
-        for team in list(elo.keys()):
-            elo[team] = Config.ELO_BASE + Config.ELO_DECAY * (elo[team] - Config.ELO_BASE)
-
-        games = regular[regular['Season'] == season].sort_values('DayNum')
-        for _, g in games.iterrows():
-            w, l = g['WTeamID'], g['LTeamID']
-            ew = 1.0 / (1.0 + 10 ** ((elo[l] - elo[w]) / Config.ELO_WIDTH))
-            mov_mult = np.log(abs(g['WScore'] - g['LScore']) + 1)
-            update = Config.ELO_K * mov_mult * (1 - ew)
+@njit(cache=True)
+def _elo_kernel(elo, seen, w_idx, l_idx, margin, season_starts,
+                base, width, k, decay, elo_out, seen_out):
+    """Sequential Elo over games pre-sorted by (Season, DayNum).
+
+    Games in season s occupy rows season_starts[s]:season_starts[s + 1]. Ratings
+    regress toward `base` before each season and are snapshotted after it.
+    Seasons cannot be run in parallel: each one starts from the previous
+    season's decayed ratings.
+    """
+    for s in range(season_starts.size - 1):
+        for t in range(elo.size):
+            elo[t] = base + decay * (elo[t] - base)
+        for i in range(season_starts[s], season_starts[s + 1]):
+            w = w_idx[i]
+            l = l_idx[i]
+            ew = 1.0 / (1.0 + 10.0 ** ((elo[l] - elo[w]) / width))
+            update = k * math.log(margin[i] + 1.0) * (1.0 - ew)
             elo[w] += update
             elo[l] -= update
+            seen[w] = True
+            seen[l] = True
+        elo_out[s, :] = elo
+        seen_out[s, :] = seen
 
-        for team, rating in elo.items():
-            season_elos.append({'Season': season, 'TeamID': team, 'elo': rating})
 
-    for team in list(elo.keys()):
-        decayed = Config.ELO_BASE + Config.ELO_DECAY * (elo[team] - Config.ELO_BASE)
-        season_elos.append({'Season': backtest_season, 'TeamID': team, 'elo': decayed})
+def compute_elo(regular, backtest_season):
+    print("⚡ Computing Elo ratings...")
+    # Same game sequence as the original per-season sort_values('DayNum'): that sort is a
+    # quicksort on int64 DayNum, and its order among same-day games feeds every rating
+    games = regular[regular['Season'] < backtest_season]
+    season_of = games['Season'].to_numpy()
+    day = games['DayNum'].to_numpy(dtype=np.int64)
+    order = [rows[np.argsort(day[rows], kind='quicksort')]
+             for rows in (np.flatnonzero(season_of == season) for season in np.unique(season_of))]
+    games = games.iloc[np.concatenate(order) if order else np.arange(0)]
+
+    codes, team_ids = pd.factorize(
+        pd.concat([games['WTeamID'], games['LTeamID']], ignore_index=True))
+    n_games, n_teams = len(games), len(team_ids)
+    w_idx = np.ascontiguousarray(codes[:n_games], dtype=np.int64)
+    l_idx = np.ascontiguousarray(codes[n_games:], dtype=np.int64)
+    margin = np.abs(games['WScore'].to_numpy(dtype=np.float64)
+                    - games['LScore'].to_numpy(dtype=np.float64))
+    seasons, starts = np.unique(games['Season'].to_numpy(), return_index=True)
+    season_starts = np.append(starts, n_games).astype(np.int64)
+
+    elo = np.full(n_teams, float(Config.ELO_BASE))
+    seen = np.zeros(n_teams, dtype=np.bool_)
+    elo_out = np.empty((len(seasons), n_teams))
+    seen_out = np.zeros((len(seasons), n_teams), dtype=np.bool_)
+    _elo_kernel(elo, seen, w_idx, l_idx, margin, season_starts,
+                float(Config.ELO_BASE), float(Config.ELO_WIDTH), float(Config.ELO_K),
+                float(Config.ELO_DECAY), elo_out, seen_out)
+
+    frames = [pd.DataFrame({'Season': season, 'TeamID': team_ids[seen_out[s]],
+                            'elo': elo_out[s, seen_out[s]]})
+              for s, season in enumerate(seasons)]
+    decayed = Config.ELO_BASE + Config.ELO_DECAY * (elo - Config.ELO_BASE)
+    frames.append(pd.DataFrame({'Season': backtest_season, 'TeamID': team_ids[seen],
+                                'elo': decayed[seen]}))
+    return pd.concat(frames, ignore_index=True)
+
+
+ELO_CACHE_VERSION = 2  # bump whenever compute_elo's output changes for the same games
+
+
+def get_elo(regular, backtest_season, cache_dir=None):
+    """compute_elo with a parquet cache keyed on the game results and Elo settings."""
+    if cache_dir is None:
+        return compute_elo(regular, backtest_season)
+
+    cols = ['Season', 'DayNum', 'WTeamID', 'WScore', 'LTeamID', 'LScore']
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(pd.util.hash_pandas_object(regular[cols], index=False).to_numpy().tobytes())
+    digest.update(f"v{ELO_CACHE_VERSION}-{backtest_season}-{Config.ELO_BASE}-{Config.ELO_WIDTH}-"
+                  f"{Config.ELO_K}-{Config.ELO_DECAY}".encode())
+    path = Path(cache_dir) / f"elo_{backtest_season}_{digest.hexdigest()}.parquet"
+    if path.exists():
+        try:
+            elo_df = pd.read_parquet(path)
+            print(f"⚡ Elo ratings loaded from cache ({path.name})")
+            return elo_df
+        except Exception as exc:
+            print(f"⚠️ Ignoring unreadable Elo cache {path.name}: {exc}")
 
-    return pd.DataFrame(season_elos)
+    elo_df = compute_elo(regular, backtest_season)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        elo_df.to_parquet(path, index=False)
+    except Exception as exc:
+        print(f"⚠️ Could not write Elo cache to {path.parent}: {exc}")
+    return elo_df
+
+
+def _group_agg_polars(df, keys, spec):
+    """Polars equivalent of df.groupby(keys).agg(**spec) for 'size'/'mean' specs."""
+    src_cols = sorted({src for src, _ in spec.values()})
+    exprs = [pl.len().cast(pl.Int64).alias(out) if how == 'size' else pl.col(src).mean().alias(out)
+             for out, (src, how) in spec.items()]
+    out = (pl.from_pandas(df[keys + src_cols])
+           .group_by(keys)
+           .agg(exprs)
+           .sort(keys)
+           .to_pandas())
+    return out.set_index(keys)
+
+
+def _side_season_stats(regular, side):
+    """Per-(Season, TeamID) means over the games a team won ('W') or lost ('L')."""
+    opp = 'L' if side == 'W' else 'W'
+    spec = {
+        f'{side}_games': (f'{side}Score', 'size'),
+        f'{side}_score': (f'{side}Score', 'mean'),
+    }
+    missing = []
+    for stat in BOX_SCORE_STATS:
+        out_col = f'{side}_{stat.lower()}'
+        if f'{side}{stat}' in regular.columns:
+            spec[out_col] = (f'{side}{stat}', 'mean')
+        else:
+            missing.append(out_col)
+    opp_col = 'opp_score' if side == 'W' else 'opp_score_L'
+    spec[opp_col] = (f'{opp}Score', 'mean')
+
+    keys = ['Season', f'{side}TeamID']
+    if HAS_POLARS:
+        out = _group_agg_polars(regular, keys, spec)
+    else:
+        out = regular.groupby(keys).agg(**spec)
+    for col in missing:
+        out[col] = 0.0
+    order = ([f'{side}_games', f'{side}_score']
+             + [f'{side}_{stat.lower()}' for stat in BOX_SCORE_STATS] + [opp_col])
+    out = out[order].reset_index()
+    return out.rename(columns={f'{side}TeamID': 'TeamID'})
 
 
 def compute_season_stats(regular):
     print("📊 Computing season stats...")
-    records = []
-    for (season, team), grp in regular.groupby(['Season', 'WTeamID']):
-        records.append({
-            'Season': season, 'TeamID': team,
-            'W_games': len(grp), 'W_score': grp['WScore'].mean(),
-            'W_fgm': grp['WFGM'].mean() if 'WFGM' in grp else 0,
-            'W_fga': grp['WFGA'].mean() if 'WFGA' in grp else 0,
-            'W_fgm3': grp['WFGM3'].mean() if 'WFGM3' in grp else 0,
-            'W_fga3': grp['WFGA3'].mean() if 'WFGA3' in grp else 0,
-            'W_ftm': grp['WFTM'].mean() if 'WFTM' in grp else 0,
-            'W_fta': grp['WFTA'].mean() if 'WFTA' in grp else 0,
-            'W_or': grp['WOR'].mean() if 'WOR' in grp else 0,
-            'W_dr': grp['WDR'].mean() if 'WDR' in grp else 0,
-            'W_ast': grp['WAst'].mean() if 'WAst' in grp else 0,
-            'W_to': grp['WTO'].mean() if 'WTO' in grp else 0,
-            'W_stl': grp['WStl'].mean() if 'WStl' in grp else 0,
-            'W_blk': grp['WBlk'].mean() if 'WBlk' in grp else 0,
-            'W_pf': grp['WPF'].mean() if 'WPF' in grp else 0,
-            'opp_score': grp['LScore'].mean(),
-        })
-    for (season, team), grp in regular.groupby(['Season', 'LTeamID']):
-        records.append({
-            'Season': season, 'TeamID': team,
-            'L_games': len(grp), 'L_score': grp['LScore'].mean(),
-            'L_fgm': grp['LFGM'].mean() if 'LFGM' in grp else 0,
-            'L_fga': grp['LFGA'].mean() if 'LFGA' in grp else 0,
-            'L_fgm3': grp['LFGM3'].mean() if 'LFGM3' in grp else 0,
-            'L_fga3': grp['LFGA3'].mean() if 'LFGA3' in grp else 0,
-            'L_ftm': grp['LFTM'].mean() if 'LFTM' in grp else 0,
-            'L_fta': grp['LFTA'].mean() if 'LFTA' in grp else 0,
-            'L_or': grp['LOR'].mean() if 'LOR' in grp else 0,
-            'L_dr': grp['LDR'].mean() if 'LDR' in grp else 0,
-            'L_ast': grp['LAst'].mean() if 'LAst' in grp else 0,
-            'L_to': grp['LTO'].mean() if 'LTO' in grp else 0,
-            'L_stl': grp['LStl'].mean() if 'LStl' in grp else 0,
-            'L_blk': grp['LBlk'].mean() if 'LBlk' in grp else 0,
-            'L_pf': grp['LPF'].mean() if 'LPF' in grp else 0,
-            'opp_score_L': grp['WScore'].mean(),
-        })
-
-    df = pd.DataFrame(records)
-    agg = df.groupby(['Season', 'TeamID']).agg('mean').reset_index()
+    agg = _side_season_stats(regular, 'W').merge(
+        _side_season_stats(regular, 'L'), on=['Season', 'TeamID'], how='outer')
 
     agg['wins'] = agg.get('W_games', 0)
     agg['losses'] = agg.get('L_games', 0)
@@ -628,7 +961,7 @@ def compute_season_stats(regular):
     agg['opp_ppg'] = opp_ppg
     agg['point_diff'] = ppg - opp_ppg
 
-    agg['pyth'] = np.where(ppg + opp_ppg > 0, ppg**8 / (ppg**8 + opp_ppg**8), 0.5)
+    agg['pyth'] = pythagorean_expectation(ppg, opp_ppg)
 
     fga = agg.get('W_fga', 50)
     fgm = agg.get('W_fgm', 20)
@@ -655,82 +988,88 @@ def compute_season_stats(regular):
     agg['stl_rate'] = agg.get('W_stl', 6)
     agg['tempo'] = possessions
 
-    return agg
+    # Consolidate the column-by-column build so downstream merges see one block per dtype
+    return agg.copy()
+
+
+SEASON_STATS_CACHE_VERSION = 2  # bump whenever compute_season_stats' output changes for the same games
+
+
+def season_cache_key(games: pd.DataFrame, season) -> str:
+    """Content key for one season of regular-season games and the season-stats settings."""
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(pd.util.hash_pandas_object(games, index=False).to_numpy().tobytes())
+    digest.update(f"v{SEASON_STATS_CACHE_VERSION}-{season}-{Config.PYTH_EXPONENT}-"
+                  f"{','.join(games.columns)}".encode())
+    return digest.hexdigest()
+
+
+def get_season_stats(regular, cache_dir=None):
+    """compute_season_stats with a per-season parquet cache.
+
+    Seasons whose games are unchanged load from `cache_dir`; only the rest are
+    recomputed (in one grouped pass) and written back.
+    """
+    if cache_dir is None:
+        return compute_season_stats(regular)
+
+    cache_dir = Path(cache_dir)
+    cached, missing = [], {}
+    for season, games in regular.groupby('Season', sort=True):
+        path = cache_dir / f"season_stats_{season}_{season_cache_key(games, season)}.parquet"
+        if not path.exists():
+            missing[season] = path
+            continue
+        try:
+            cached.append(pd.read_parquet(path))
+        except Exception as exc:
+            print(f"⚠️ Ignoring unreadable season cache {path.name}: {exc}")
+            missing[season] = path
+
+    if missing:
+        fresh = compute_season_stats(regular[regular['Season'].isin(list(missing))])
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            for season, path in missing.items():
+                fresh[fresh['Season'] == season].to_parquet(path, index=False)
+        except Exception as exc:
+            print(f"⚠️ Could not write season stats cache to {cache_dir}: {exc}")
+        cached.append(fresh)
+    if len(missing) < regular['Season'].nunique():
+        print(f"📊 Season stats: {regular['Season'].nunique() - len(missing)} seasons from cache, "
+              f"{len(missing)} recomputed")
+
+    stats = pd.concat(cached, ignore_index=True)
+    return stats.sort_values(['Season', 'TeamID'], kind='stable').reset_index(drop=True)
+
+
+# Last DayNum of each tournament round (R64 through F4); anything later is the title game
+ROUND_DAY_BINS = np.array([135, 137, 139, 141, 143])
 
 
 def build_matchup_features(tourney, team_stats, elo_df, seeds, kenpom, backtest_season):
     print("🔧 Building matchup features...")
-    rows = []
-    for _, g in tourney.iterrows():
-        w, l = g['WTeamID'], g['LTeamID']
-        t1, t2 = min(w, l), max(w, l)
-        row = {
-            'Season': g['Season'],
-            'T1_TeamID': t1, 'T2_TeamID': t2,
-            'PointDiff': g['WScore'] - g['LScore'] if t1 == w else g['LScore'] - g['WScore'],
-            'T1_won': 1 if t1 == w else 0,
-        }
-        if 'DayNum' in g:
-            row['DayNum'] = g['DayNum']
-        rows.append(row)
-    td = pd.DataFrame(rows)
+    w = tourney['WTeamID'].to_numpy()
+    l = tourney['LTeamID'].to_numpy()
+    margin = tourney['WScore'].to_numpy() - tourney['LScore'].to_numpy()
+    t1_won = w <= l
+    td = pd.DataFrame({
+        'Season': tourney['Season'].to_numpy(),
+        'T1_TeamID': np.minimum(w, l),
+        'T2_TeamID': np.maximum(w, l),
+        'PointDiff': np.where(t1_won, margin, -margin),
+        'T1_won': t1_won.astype(np.int64),
+    })
+    if 'DayNum' in tourney.columns:
+        td['DayNum'] = tourney['DayNum'].to_numpy()
 
     if 'DayNum' in td.columns:
-        def infer_round(day):
-            if pd.isna(day): return 0
-            d = int(day)
-            if d <= 135: return 1
-            elif d <= 137: return 2
-            elif d <= 139: return 3
-            elif d <= 141: return 4
-            elif d <= 143: return 5
-            else: return 6
-        td['Round'] = td['DayNum'].apply(infer_round)
+        day = pd.to_numeric(td['DayNum']).to_numpy(dtype=np.float64)
+        rounds = np.searchsorted(ROUND_DAY_BINS, np.floor(day), side='left') + 1
+        td['Round'] = np.where(np.isnan(day), 0, np.minimum(rounds, 6)).astype(np.int64)
     else:
         td['Round'] = 0
 
-    # Merge seeds
-    s1 = seeds[['Season', 'TeamID', 'SeedNum', 'Region']].rename(
-        columns={'TeamID': 'T1_TeamID', 'SeedNum': 'T1_seed', 'Region': 'T1_region'})
-    s2 = seeds[['Season', 'TeamID', 'SeedNum', 'Region']].rename(
-        columns={'TeamID': 'T2_TeamID', 'SeedNum': 'T2_seed', 'Region': 'T2_region'})
-    td = td.merge(s1, on=['Season', 'T1_TeamID'], how='left')
-    td = td.merge(s2, on=['Season', 'T2_TeamID'], how='left')
-    td['seed_diff'] = td['T1_seed'].fillna(8) - td['T2_seed'].fillna(8)
-
-    # Merge team stats
-    ts1 = prefix_rename(team_stats, 'T1')
-    ts2 = prefix_rename(team_stats, 'T2')
-    td = td.merge(ts1, on=['Season', 'T1_TeamID'], how='left')
-    td = td.merge(ts2, on=['Season', 'T2_TeamID'], how='left')
-
-    # Merge Elo
-    e1 = elo_df.rename(columns={'TeamID': 'T1_TeamID', 'elo': 'T1_elo'})
-    e2 = elo_df.rename(columns={'TeamID': 'T2_TeamID', 'elo': 'T2_elo'})
-    td = td.merge(e1, on=['Season', 'T1_TeamID'], how='left')
-    td = td.merge(e2, on=['Season', 'T2_TeamID'], how='left')
-    td['elo_diff'] = td['T1_elo'].fillna(1000) - td['T2_elo'].fillna(1000)
-
-    # Merge KenPom
-    if kenpom is not None:
-        kp_cols = [c for c in kenpom.columns if c not in ['Season', 'TeamID', 'TeamName']]
-        kp = kenpom[['Season', 'TeamID'] + kp_cols].copy()
-        kp1 = prefix_rename(kp, 'T1')
-        kp2 = prefix_rename(kp, 'T2')
-        td = td.merge(kp1, on=['Season', 'T1_TeamID'], how='left')
-        td = td.merge(kp2, on=['Season', 'T2_TeamID'], how='left')
-
-        for stat in ['KP_ORtg', 'KP_DRtg', 'KP_NetRtg', 'KP_AdjTempo']:
-            c1, c2 = f'T1_{stat}', f'T2_{stat}'
-            if c1 in td.columns and c2 in td.columns:
-                td[f'{stat}_diff'] = td[c1].fillna(0) - td[c2].fillna(0)
-        if 'T1_KP_ORtg' in td.columns and 'T2_KP_DRtg' in td.columns:
-            td['T1_off_vs_T2_def'] = td['T1_KP_ORtg'].fillna(100) - td['T2_KP_DRtg'].fillna(100)
-            td['T2_off_vs_T1_def'] = td['T2_KP_ORtg'].fillna(100) - td['T1_KP_DRtg'].fillna(100)
-            td['matchup_edge'] = td['T1_off_vs_T2_def'] - td['T2_off_vs_T1_def']
-        if 'T1_KP_AdjTempo' in td.columns and 'T2_KP_AdjTempo' in td.columns:
-            td['tempo_mismatch'] = abs(td['T1_KP_AdjTempo'].fillna(67) - td['T2_KP_AdjTempo'].fillna(67))
-
     # Archetypes
     if kenpom is not None and 'RankAdjOE' in kenpom.columns:
         archetype_base = kenpom[['Season', 'TeamID']].copy()
@@ -749,64 +1088,238 @@ def build_matchup_features(tourney, team_stats, elo_df, seeds, kenpom, backtest_
     archetype_base = ArchetypeEngine.assign_archetypes_to_df(
         archetype_base, 'RankAdjOE', 'RankAdjDE', 'RankAdjTempo')
 
-    a1 = archetype_base[['Season', 'TeamID', 'Archetype']].rename(
-        columns={'TeamID': 'T1_TeamID', 'Archetype': 'T1_Archetype'})
-    a2 = archetype_base[['Season', 'TeamID', 'Archetype']].rename(
-        columns={'TeamID': 'T2_TeamID', 'Archetype': 'T2_Archetype'})
-    td = td.merge(a1, on=['Season', 'T1_TeamID'], how='left')
-    td = td.merge(a2, on=['Season', 'T2_TeamID'], how='left')
-    td['T1_Archetype'] = td['T1_Archetype'].fillna('The Unknown')
-    td['T2_Archetype'] = td['T2_Archetype'].fillna('The Unknown')
+    # One side table per tournament team-season (seed, season stats, Elo, KenPom,
+    # archetype), then a single merge per side instead of two per source
+    stat_cols = [c for c in team_stats.columns if c not in ['Season', 'TeamID']]
+    kp_cols = []
+    sources = [
+        seeds[['Season', 'TeamID', 'SeedNum', 'Region']].rename(
+            columns={'SeedNum': 'seed', 'Region': 'region'}),
+        team_stats,
+        elo_df,
+    ]
+    if kenpom is not None:
+        kp_cols = [c for c in kenpom.columns if c not in ['Season', 'TeamID', 'TeamName']]
+        sources.append(kenpom[['Season', 'TeamID'] + kp_cols])
+    sources.append(archetype_base[['Season', 'TeamID', 'Archetype']])
+
+    side = pd.concat([
+        td[['Season', 'T1_TeamID']].set_axis(['Season', 'TeamID'], axis=1),
+        td[['Season', 'T2_TeamID']].set_axis(['Season', 'TeamID'], axis=1),
+    ]).drop_duplicates()
+    for src in sources:
+        side = side.merge(src, on=['Season', 'TeamID'], how='left')
+
+    base_cols = list(td.columns)
+    td = td.merge(prefix_rename(side, 'T1'), on=['Season', 'T1_TeamID'], how='left')
+    td = td.merge(prefix_rename(side, 'T2'), on=['Season', 'T2_TeamID'], how='left')
+    merged_cols = set(td.columns)
+
+    td['seed_diff'] = td['T1_seed'].fillna(8) - td['T2_seed'].fillna(8)
+    td['elo_diff'] = td['T1_elo'].fillna(1000) - td['T2_elo'].fillna(1000)
+
+    if kenpom is not None:
+        td = add_diff_columns(td, ['KP_ORtg', 'KP_DRtg', 'KP_NetRtg', 'KP_AdjTempo'])
+        if 'T1_KP_ORtg' in td.columns and 'T2_KP_DRtg' in td.columns:
+            td['T1_off_vs_T2_def'] = td['T1_KP_ORtg'].fillna(100) - td['T2_KP_DRtg'].fillna(100)
+            td['T2_off_vs_T1_def'] = td['T2_KP_ORtg'].fillna(100) - td['T1_KP_DRtg'].fillna(100)
+            td['matchup_edge'] = td['T1_off_vs_T2_def'] - td['T2_off_vs_T1_def']
+        if 'T1_KP_AdjTempo' in td.columns and 'T2_KP_AdjTempo' in td.columns:
+            td['tempo_mismatch'] = abs(td['T1_KP_AdjTempo'].fillna(67) - td['T2_KP_AdjTempo'].fillna(67))
+    kp_derived = [c for c in td.columns
+                  if c not in merged_cols and c not in ('seed_diff', 'elo_diff')]
+
+    # Keep the historical column layout; model feature order follows it
+    def both_sides(cols):
+        return [f'{p}_{c}' for p in ('T1', 'T2') for c in cols]
+
+    td = td[base_cols + both_sides(['seed', 'region']) + ['seed_diff']
+            + both_sides(stat_cols) + both_sides(['elo']) + ['elo_diff']
+            + both_sides(kp_cols) + kp_derived + both_sides(['Archetype'])]
+    # Shared sorted vocabulary: codes are the integers LabelEncoder used to produce
+    arch_names = pd.concat([td['T1_Archetype'], td['T2_Archetype']]).fillna('The Unknown')
+    arch_dtype = pd.CategoricalDtype(np.sort(arch_names.unique()))
+    td['T1_Archetype'] = td['T1_Archetype'].fillna('The Unknown').astype(arch_dtype)
+    td['T2_Archetype'] = td['T2_Archetype'].fillna('The Unknown').astype(arch_dtype)
+    t1_codes = td['T1_Archetype'].cat.codes.to_numpy(dtype=np.int64)
+    t2_codes = td['T2_Archetype'].cat.codes.to_numpy(dtype=np.int64)
 
     train_mask = td['Season'] < backtest_season
     arch_matrix = ArchetypeEngine.build_matchup_matrix(td[train_mask])
 
-    def get_arch_edge(row):
-        key = f"{row['T1_Archetype']}__vs__{row['T2_Archetype']}"
-        entry = arch_matrix.get(key, {'win_rate': 0.5, 'total': 0})
-        return entry['win_rate'], entry['total']
-
-    td['arch_matchup_wr'], td['arch_matchup_n'] = zip(*td.apply(get_arch_edge, axis=1))
+    # (K, K) lookup tables over archetype codes, filled from the string-keyed matrix
+    k = len(arch_dtype.categories)
+    wr_lut, n_lut = np.full((k, k), 0.5), np.zeros((k, k), dtype=np.int64)
+    for i, a1 in enumerate(arch_dtype.categories):
+        for j, a2 in enumerate(arch_dtype.categories):
+            entry = arch_matrix.get(f"{a1}__vs__{a2}")
+            if entry is not None:
+                wr_lut[i, j], n_lut[i, j] = entry['win_rate'], entry['total']
+    td['arch_matchup_wr'] = wr_lut[t1_codes, t2_codes]
+    td['arch_matchup_n'] = n_lut[t1_codes, t2_codes]
     td['arch_matchup_edge'] = td['arch_matchup_wr'] - 0.5
 
-    le = LabelEncoder()
-    all_archetypes = pd.concat([td['T1_Archetype'], td['T2_Archetype']]).unique()
-    le.fit(all_archetypes)
-    td['T1_arch_encoded'] = le.transform(td['T1_Archetype'])
-    td['T2_arch_encoded'] = le.transform(td['T2_Archetype'])
-
-    def get_seed_prob(row):
-        s1, s2 = int(row.get('T1_seed', 8)), int(row.get('T2_seed', 8))
-        key = (min(s1, s2), max(s1, s2))
-        base_prob = Config.SEED_WIN_RATES.get(key, 0.5)
-        return base_prob if s1 <= s2 else 1 - base_prob
+    td['T1_arch_encoded'] = t1_codes
+    td['T2_arch_encoded'] = t2_codes
 
-    td['seed_implied_prob'] = td.apply(get_seed_prob, axis=1)
+    t1_seeds = td['T1_seed'].fillna(8).to_numpy(dtype=np.int64)
+    t2_seeds = td['T2_seed'].fillna(8).to_numpy(dtype=np.int64)
+    td['seed_implied_prob'] = SEED_IMPLIED[t1_seeds, t2_seeds]
 
-    for stat in ['off_eff', 'def_eff', 'net_eff', 'efg_pct', 'to_rate', 'ft_rate',
-                 'oreb_pct', 'three_rate', 'pyth', 'win_pct', 'point_diff', 'tempo']:
-        c1, c2 = f'T1_{stat}', f'T2_{stat}'
-        if c1 in td.columns and c2 in td.columns:
-            td[f'{stat}_diff'] = td[c1].fillna(0) - td[c2].fillna(0)
+    td = add_diff_columns(td, ['off_eff', 'def_eff', 'net_eff', 'efg_pct', 'to_rate', 'ft_rate',
+                               'oreb_pct', 'three_rate', 'pyth', 'win_pct', 'point_diff', 'tempo'])
 
     print(f"   Matchup features: {td.shape[1]} columns, {len(td)} matchups")
-    return td, arch_matrix, le, archetype_base
+    return td, arch_matrix, arch_dtype.categories, archetype_base
+
+
+def leaf_tfidf(leaves_train, leaves_test, max_features: int = 500):
+    """TF-IDF of XGBoost leaf ids, built straight from the (rows, trees) leaf arrays.
+
+    Matches TfidfVectorizer(max_features) over the space-joined ids: its token
+    pattern drops single-digit ids, ids are shared across trees, and columns
+    follow the string-sorted vocabulary.
+    """
+    from scipy import sparse
+    from sklearn.preprocessing import normalize
+
+    lt = np.asarray(leaves_train, dtype=np.int64)
+    ls = np.asarray(leaves_test, dtype=np.int64)
+    n_ids = int(max(lt.max(initial=0), ls.max(initial=0))) + 1
+
+    def leaf_counts(leaves):
+        rows = np.repeat(np.arange(leaves.shape[0]), leaves.shape[1])
+        ids = leaves.ravel()
+        keep = ids >= 10
+        return sparse.csr_matrix(
+            (np.ones(keep.sum(), dtype=np.int64), (rows[keep], ids[keep])),
+            shape=(leaves.shape[0], n_ids))
+
+    c_train, c_test = leaf_counts(lt), leaf_counts(ls)
+    vocab = np.flatnonzero(c_train.getnnz(axis=0))
+    vocab = vocab[np.argsort(vocab.astype(str))]
+    if len(vocab) > max_features:
+        tfs = np.asarray(c_train[:, vocab].sum(axis=0)).ravel()
+        vocab = vocab[np.sort((-tfs).argsort()[:max_features])]
+    c_train, c_test = c_train[:, vocab], c_test[:, vocab]
+
+    # Smoothed idf, then l2-normalized rows (TfidfTransformer defaults)
+    idf = np.log((c_train.shape[0] + 1) / (c_train.getnnz(axis=0) + 1.0)) + 1
+
+    def weight(counts):
+        x = counts.astype(np.float64)
+        x.sort_indices()
+        x.data *= idf[x.indices]
+        return normalize(x, norm='l2', copy=False)
+
+    return weight(c_train), weight(c_test)
 
 
 # =============================================================================
 # MODEL TRAINING — STACKED ENSEMBLE
 # =============================================================================
-def train_model(td, backtest_season):
-    print(f"\n🧠 Training stacked ensemble (backtest={backtest_season})...")
+def lgb_gpu_available() -> bool:
+    """Whether LightGBM can fit with device_type='gpu' (needs a GPU build and an OpenCL device)."""
+    if not HAS_LGB:
+        return False
+    X = np.arange(40, dtype=np.float64).reshape(20, 2)
+    try:
+        lgb.train({'device_type': 'gpu', 'objective': 'binary', 'verbose': -1,
+                   'num_iterations': 1, 'min_data_in_leaf': 1},
+                  lgb.Dataset(X, label=np.arange(20) % 2))
+        return True
+    except Exception:
+        return False
+
+
+def resolve_device(requested: str):
+    """Map --device (cpu/cuda/auto) to the (XGBoost, LightGBM) devices that actually work."""
+    if requested == 'cpu':
+        return 'cpu', 'cpu'
+    has_cuda = HAS_XGB and bool(xgb.build_info().get('USE_CUDA')) and shutil.which('nvidia-smi') is not None
+    if not has_cuda and requested == 'cuda':
+        print("⚠️ --device cuda requested but no CUDA-enabled XGBoost/GPU found. Training XGBoost on CPU.")
+    # The pip XGBoost wheel always reports CUDA, so LightGBM's OpenCL GPU mode is probed on its own
+    lgb_gpu = lgb_gpu_available()
+    if HAS_LGB and not lgb_gpu:
+        print("⚠️ LightGBM GPU (OpenCL) unavailable. Training LightGBM on CPU.")
+    return ('cuda' if has_cuda else 'cpu'), ('gpu' if lgb_gpu else 'cpu')
+
+
+def training_data_key(train_frames, eval_frames) -> str:
+    """Hash of everything the boosters are fitted on, for matching saved models to a run.
+
+    Covers the training rows and labels, the early-stopping (backtest) rows, which
+    shape the XGBoost model too, and the booster settings and devices.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for frame in (*train_frames, *eval_frames):
+        names = frame.columns if isinstance(frame, pd.DataFrame) else [frame.name]
+        digest.update(",".join(map(str, names)).encode())
+        digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    digest.update(f"{sorted(Config.XGB_PARAMS.items())}-{Config.XGB_ROUNDS}-"
+                  f"{Config.DEVICE}-{Config.LGB_DEVICE}".encode())
+    return digest.hexdigest()
+
 
-    train = td[td['Season'] < backtest_season].copy()
-    test = td[td['Season'] == backtest_season].copy()
+def load_boosters(xgb_path: Path, lgb_path: Path, features, backtest_season, data_key):
+    """Saved XGBoost/LightGBM boosters for --skip-training, or (None, None) to retrain.
+
+    The XGBoost file carries the backtest season, training-data key and LightGBM model
+    hash it was saved with; any mismatch means the models can't be reused for this run.
+    """
+    if not xgb_path.exists() or (HAS_LGB and not lgb_path.exists()):
+        print(f"   ⚠️ No saved models in {xgb_path.parent}. Training from scratch.")
+        return None, None
+    try:
+        xgb_model = xgb.Booster(model_file=str(xgb_path))
+        lgb_text = lgb_path.read_text() if HAS_LGB else None
+        lgb_booster = lgb.Booster(model_str=lgb_text) if HAS_LGB else None
+    except Exception as exc:
+        print(f"   ⚠️ Could not load saved models ({exc}). Training from scratch.")
+        return None, None
+    if xgb_model.attr('backtest_season') != str(backtest_season):
+        print(f"   ⚠️ Saved models were trained for backtest {xgb_model.attr('backtest_season')}, "
+              f"not {backtest_season}. Training from scratch.")
+        return None, None
+    if xgb_model.attr('training_data') != data_key:
+        print("   ⚠️ Saved models were trained on different data or settings. Training from scratch.")
+        return None, None
+    if HAS_LGB and xgb_model.attr('lgb_model') != hashlib.sha256(lgb_text.encode()).hexdigest():
+        print("   ⚠️ Saved LightGBM model does not belong with the XGBoost model. Training from scratch.")
+        return None, None
+    if xgb_model.feature_names != features or (
+            lgb_booster is not None and lgb_booster.feature_name() != features):
+        print("   ⚠️ Saved models were trained on a different feature set. Training from scratch.")
+        return None, None
+    print(f"   ⚡ Reusing saved boosters from {xgb_path.parent}")
+    return xgb_model, lgb_booster
+
+
+def train_model(td, backtest_season):
+    # Step-1-only dependencies; imported here so a Step-2-only run skips scipy/sklearn init
+    from scipy.special import ndtr
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.metrics import brier_score_loss, log_loss, accuracy_score
+
+    print(f"\n🧠 Training stacked ensemble (backtest={backtest_season}, "
+          f"device: xgb={Config.DEVICE}, lgb={Config.LGB_DEVICE})...")
+
+    # Season-ordered rows make every split a contiguous slice found by binary search
+    if not td['Season'].is_monotonic_increasing:
+        td = td.sort_values('Season', kind='stable')
+    seasons = td['Season'].to_numpy()
+    lo = np.searchsorted(seasons, backtest_season, side='left')
+    hi = np.searchsorted(seasons, backtest_season, side='right')
+    train = td.iloc[:lo].copy()
+    test = td.iloc[lo:hi].copy()
 
     if len(test) == 0:
         print(f"⚠️ No test data for {backtest_season}. Using last available season.")
         last_season = train['Season'].max()
-        test = train[train['Season'] == last_season].copy()
-        train = train[train['Season'] < last_season].copy()
+        split = np.searchsorted(seasons[:lo], last_season, side='left')
+        test = train.iloc[split:].copy()
+        train = train.iloc[:split].copy()
 
     exclude = {'Season', 'T1_TeamID', 'T2_TeamID', 'PointDiff', 'T1_won',
                'T1_Archetype', 'T2_Archetype', 'T1_region', 'T2_region',
@@ -817,55 +1330,101 @@ def train_model(td, backtest_season):
 
     X_train = train[features].fillna(0)
     X_test = test[features].fillna(0)
+    # XGBoost bins/quantizes in float32 anyway; hand it (and the RF fallback) one
+    # C-contiguous float32 matrix per split. LightGBM fits and scores on the float64 frames.
+    X_train_np = np.ascontiguousarray(X_train.to_numpy(dtype=np.float32))
+    X_test_np = np.ascontiguousarray(X_test.to_numpy(dtype=np.float32))
     y_train_margin = train['PointDiff']
     y_train_binary = train['T1_won']
     y_test_binary = test['T1_won']
 
-    # --- Model 1: XGBoost Margin Predictor ---
-    print("   Training XGBoost margin predictor...")
-    dtrain = xgb.DMatrix(X_train, label=y_train_margin)
-    dtest = xgb.DMatrix(X_test, label=test['PointDiff'])
-    xgb_model = xgb.train(Config.XGB_PARAMS, dtrain, Config.XGB_ROUNDS,
-                           evals=[(dtest, 'test')], verbose_eval=False,
-                           early_stopping_rounds=30)
-    xgb_margin_pred = xgb_model.predict(dtest)
-    xgb_prob = norm.cdf(xgb_margin_pred / Config.SIGMA)
-
-    # --- Model 2: LightGBM / RF Classifier ---
+    xgb_path = Config.OUTPUT_DIR / 'model_xgb.ubj'
+    lgb_path = Config.OUTPUT_DIR / 'model_lgb.txt'
+    data_key = training_data_key((X_train, y_train_margin, y_train_binary),
+                                 (X_test, test['PointDiff']))
+    xgb_model = lgb_booster = None
+    if Config.SKIP_TRAINING:
+        xgb_model, lgb_booster = load_boosters(xgb_path, lgb_path, features,
+                                               backtest_season, data_key)
+    reused = xgb_model is not None
+
+    # Model 2 is independent of Models 1 and 3, so it fits on a worker thread while
+    # XGBoost and the leaf-logistic train; the native fits all release the GIL.
+    # Split the cores between the two sides so their OpenMP pools don't contend.
+    n_threads = max(1, (os.cpu_count() or 1) // 2)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        # --- Model 2: LightGBM / RF Classifier ---
+        model_2_fit = None  # stays None when a saved LightGBM booster is reused
+        if HAS_LGB and lgb_booster is None:
+            print("   Training LightGBM classifier...")
+            lgb_model = lgb.LGBMClassifier(
+                n_estimators=300, max_depth=5, learning_rate=0.05,
+                subsample=0.7, colsample_bytree=0.7, random_state=42, verbose=-1, n_jobs=n_threads,
+                **({'device_type': 'gpu', 'max_bin': 255} if Config.LGB_DEVICE == 'gpu' else {}))
+            # LightGBM bins from the raw values, so it keeps the float64 frame
+            # to leave its histogram boundaries (and predictions) unchanged
+            model_2_fit = pool.submit(lgb_model.fit, X_train, y_train_binary)
+        elif not HAS_LGB:
+            print("   Training RF classifier (LGB fallback)...")
+            from sklearn.ensemble import RandomForestClassifier
+            rf_model = RandomForestClassifier(n_estimators=300, max_depth=8, random_state=42,
+                                              n_jobs=n_threads)
+            model_2_fit = pool.submit(rf_model.fit, X_train_np, y_train_binary)
+
+        # --- Model 1: XGBoost Margin Predictor ---
+        # hist training pre-bins once; the test matrix shares the training quantile cuts
+        dtrain = xgb.QuantileDMatrix(X_train_np, label=y_train_margin, feature_names=features)
+        dtest = xgb.QuantileDMatrix(X_test_np, label=test['PointDiff'], feature_names=features,
+                                    ref=dtrain)
+        if not reused:
+            print("   Training XGBoost margin predictor...")
+            xgb_params = {**Config.XGB_PARAMS, 'nthread': n_threads,
+                          **({'device': 'cuda'} if Config.DEVICE == 'cuda' else {})}
+            xgb_model = xgb.train(xgb_params, dtrain, Config.XGB_ROUNDS,
+                                   evals=[(dtest, 'test')], verbose_eval=False,
+                                   early_stopping_rounds=30)
+        xgb_margin_pred = xgb_model.inplace_predict(X_test_np)
+        # Standard normal CDF via the ufunc norm.cdf wraps, minus its argument checking;
+        # float64 input keeps the old precision (ndtr would stay float32 on booster output)
+        xgb_prob = ndtr((xgb_margin_pred / Config.SIGMA).astype(np.float64))
+
+        # --- Model 3: XGB Leaf → Logistic ---
+        print("   Training leaf-logistic model...")
+        leaves_train = xgb_model.predict(dtrain, pred_leaf=True)
+        leaves_test = xgb_model.predict(dtest, pred_leaf=True)
+        X_leaf_train, X_leaf_test = leaf_tfidf(leaves_train, leaves_test)
+        leaf_lr = LogisticRegression(max_iter=1000, C=1.0)
+        leaf_lr.fit(X_leaf_train, y_train_binary)
+        leaf_prob = leaf_lr.predict_proba(X_leaf_test)[:, 1]
+        if model_2_fit is not None:
+            model_2_fit.result()
+
     if HAS_LGB:
-        print("   Training LightGBM classifier...")
-        lgb_model = lgb.LGBMClassifier(
-            n_estimators=300, max_depth=5, learning_rate=0.05,
-            subsample=0.7, colsample_bytree=0.7, random_state=42, verbose=-1)
-        lgb_model.fit(X_train, y_train_binary)
-        lgb_prob = lgb_model.predict_proba(X_test)[:, 1]
+        if lgb_booster is None:
+            lgb_booster = lgb_model.booster_
+        lgb_prob = lgb_booster.predict(X_test, num_threads=os.cpu_count() or 0)
+        lgb_train_prob = lgb_booster.predict(X_train, num_threads=os.cpu_count() or 0)
     else:
-        print("   Training RF classifier (LGB fallback)...")
-        rf_model = RandomForestClassifier(n_estimators=300, max_depth=8, random_state=42)
-        rf_model.fit(X_train, y_train_binary)
-        lgb_prob = rf_model.predict_proba(X_test)[:, 1]
-
-    # --- Model 3: XGB Leaf → Logistic ---
-    print("   Training leaf-logistic model...")
-    dtrain_full = xgb.DMatrix(X_train)
-    dtest_full = xgb.DMatrix(X_test)
-    leaves_train = xgb_model.predict(dtrain_full, pred_leaf=True)
-    leaves_test = xgb_model.predict(dtest_full, pred_leaf=True)
-    leaf_str_train = [' '.join(map(str, row)) for row in leaves_train]
-    leaf_str_test = [' '.join(map(str, row)) for row in leaves_test]
-    tfidf = TfidfVectorizer(max_features=500)
-    X_leaf_train = tfidf.fit_transform(leaf_str_train)
-    X_leaf_test = tfidf.transform(leaf_str_test)
-    leaf_lr = LogisticRegression(max_iter=1000, C=1.0)
-    leaf_lr.fit(X_leaf_train, y_train_binary)
-    leaf_prob = leaf_lr.predict_proba(X_leaf_test)[:, 1]
+        lgb_prob = rf_model.predict_proba(X_test_np)[:, 1]
+        lgb_train_prob = rf_model.predict_proba(X_train_np)[:, 1]
+
+    # Persist freshly trained boosters so --skip-training can re-score without them
+    if not reused:
+        try:
+            xgb_model.set_attr(backtest_season=str(backtest_season), training_data=data_key)
+            if HAS_LGB:
+                lgb_text = lgb_booster.model_to_string()
+                lgb_path.write_text(lgb_text)
+                xgb_model.set_attr(lgb_model=hashlib.sha256(lgb_text.encode()).hexdigest())
+            xgb_model.save_model(str(xgb_path))
+        except Exception as exc:
+            print(f"   ⚠️ Could not save models to {Config.OUTPUT_DIR}: {exc}")
 
     # --- Meta-Learner ---
     print("   Training meta-learner...")
-    base_model_2 = lgb_model if HAS_LGB else rf_model
     meta_train_preds = np.column_stack([
-        norm.cdf(xgb_model.predict(dtrain) / Config.SIGMA),
-        base_model_2.predict_proba(X_train)[:, 1],
+        ndtr((xgb_model.predict(dtrain) / Config.SIGMA).astype(np.float64)),
+        lgb_train_prob,
         leaf_lr.predict_proba(X_leaf_train)[:, 1],
     ])
     meta_test_preds = np.column_stack([xgb_prob, lgb_prob, leaf_prob])
@@ -904,6 +1463,29 @@ def train_model(td, backtest_season):
 # =============================================================================
 # CHATBOT JSON + TEAM PROFILES EXPORT (STEP 1 OUTPUT)
 # =============================================================================
+# Fallback for every prediction column the chatbot export reads
+PREDICTION_DEFAULTS = {
+    'T1_name': 'Unknown', 'T2_name': 'Unknown',
+    'T1_seed': 0, 'T2_seed': 0,
+    'T1_Archetype': 'Unknown', 'T2_Archetype': 'Unknown',
+    'model_prob': 0.5, 'predicted_margin': 0.0, 'value_score': 0.0,
+    'seed_implied_prob': 0.5, 'PointDiff': 0,
+    'arch_matchup_wr': 0.5, 'arch_matchup_n': 0, 'arch_matchup_edge': 0.0,
+    'elo_diff': 0.0, 'T1_elo': 1000.0, 'T2_elo': 1000.0,
+    'T1_pyth': 0.5, 'T2_pyth': 0.5,
+    'T1_off_eff': 100.0, 'T2_off_eff': 100.0,
+    'T1_def_eff': 100.0, 'T2_def_eff': 100.0,
+    'T1_net_eff': 0.0, 'T2_net_eff': 0.0,
+    'T1_efg_pct': 0.45, 'T2_efg_pct': 0.45,
+    'T1_to_rate': 0.15, 'T2_to_rate': 0.15,
+    'T1_KP_ORtg': 0.0, 'T2_KP_ORtg': 0.0,
+    'T1_KP_DRtg': 0.0, 'T2_KP_DRtg': 0.0,
+    'T1_KP_NetRtg': 0.0, 'T2_KP_NetRtg': 0.0,
+    'T1_KP_AdjTempo': 0.0, 'T2_KP_AdjTempo': 0.0,
+    'matchup_edge': 0.0, 'tempo_mismatch': 0.0,
+}
+
+
 def get_confidence_tier(prob):
     p = max(prob, 1 - prob)
     if p >= 0.85: return 'LOCK'
@@ -926,6 +1508,35 @@ def get_upset_flag(s1, s2, prob):
     return 'chalk'
 
 
+CONFIDENCE_THRESHOLDS = np.array([0.52, 0.60, 0.72, 0.85])
+CONFIDENCE_TIERS = np.array(['COIN FLIP', 'TOSS-UP', 'LEAN', 'STRONG', 'LOCK'], dtype=object)
+
+
+def confidence_tiers(probs) -> np.ndarray:
+    """Vectorized get_confidence_tier over an array of T1 win probabilities."""
+    p = np.asarray(probs, dtype=np.float64)
+    return CONFIDENCE_TIERS[np.digitize(np.maximum(p, 1 - p), CONFIDENCE_THRESHOLDS)]
+
+
+def upset_flags(s1, s2, probs) -> np.ndarray:
+    """Vectorized get_upset_flag over aligned seed/probability arrays."""
+    s1 = np.asarray(s1, dtype=np.int64)
+    s2 = np.asarray(s2, dtype=np.int64)
+    p = np.asarray(probs, dtype=np.float64)
+    favorite_seed = np.minimum(s1, s2)
+    underdog_seed = np.maximum(s1, s2)
+    favorite_prob = np.where(s1 < s2, p, 1 - p)
+    dog = pd.Series(underdog_seed).astype(str)
+    return np.select(
+        [favorite_prob < 0.50,
+         favorite_prob < 0.60,
+         (underdog_seed - favorite_seed >= 4) & (favorite_prob < 0.70)],
+        [('🚨 UPSET ALERT: ' + dog + '-seed favored!').to_numpy(dtype=object),
+         ('⚠️ UPSET WATCH: ' + dog + '-seed has a real shot').to_numpy(dtype=object),
+         ('👀 SLEEPER: ' + dog + '-seed dangerous').to_numpy(dtype=object)],
+        default='chalk')
+
+
 def generate_chatbot_responses(entry, arch_matrix):
     t1 = entry.get('t1_name', 'Team 1')
     t2 = entry.get('t2_name', 'Team 2')
@@ -942,6 +1553,8 @@ def generate_chatbot_responses(entry, arch_matrix):
     fav_seed = s1 if prob > 0.5 else s2
     arch_key = f"{a1}__vs__{a2}"
     arch_info = arch_matrix.get(arch_key, {'win_rate': 0.5, 'total': 0})
+    # The export loop already attaches the (vectorized) flag for these seeds/prob
+    upset = entry.get('upset_flag') or get_upset_flag(s1, s2, prob)
 
     return {
         'quick': f"Lean {fav} ({fav_seed}-seed) at {fav_prob:.0%}. "
@@ -952,7 +1565,7 @@ def generate_chatbot_responses(entry, arch_matrix):
                   f"Pyth {entry.get('key_factors', {}).get('t1_pyth', 'N/A'):.3f} | "
                   f"{t2} ({a2}): Elo {entry.get('key_factors', {}).get('t2_elo', 'N/A')}, "
                   f"Pyth {entry.get('key_factors', {}).get('t2_pyth', 'N/A'):.3f}"),
-        'upset': get_upset_flag(s1, s2, prob) if get_upset_flag(s1, s2, prob) != 'chalk' else 'Chalk should hold here.',
+        'upset': upset if upset != 'chalk' else 'Chalk should hold here.',
         'archetype': (f"{a1} vs {a2}: Historically {arch_info['win_rate']:.0%} win rate "
                       f"for the {a1} type ({arch_info['total']} matchups)."
                       if arch_info['total'] >= 3 else
@@ -960,6 +1573,94 @@ def generate_chatbot_responses(entry, arch_matrix):
     }
 
 
+# team_profiles.json season stats and the value used when a column is absent
+PROFILE_STAT_DEFAULTS = {
+    'win_pct': 0.5, 'ppg': 70, 'opp_ppg': 70, 'point_diff': 0, 'pyth': 0.5,
+    'off_eff': 100, 'def_eff': 100, 'net_eff': 0, 'efg_pct': 0.45, 'to_rate': 0.15,
+    'ft_rate': 0.30, 'oreb_pct': 0.30, 'three_rate': 0.30, 'tempo': 65,
+}
+
+# Columns read by prediction_entry and the Python type each must come out as
+EXPORT_DTYPES = {
+    **dict.fromkeys(['Season', 'T1_TeamID', 'T2_TeamID', 'T1_seed', 'T2_seed',
+                     'arch_matchup_n'], 'int64'),
+    **dict.fromkeys(['T1_name', 'T2_name', 'T1_Archetype', 'T2_Archetype',
+                     'confidence', 'upset_flag'], 'object'),
+    **dict.fromkeys(['model_prob', 'predicted_margin', 'value_score', 'seed_implied_prob',
+                     'PointDiff', 'arch_matchup_wr', 'arch_matchup_edge', 'elo_diff',
+                     'T1_elo', 'T2_elo', 'T1_pyth', 'T2_pyth', 'T1_off_eff', 'T2_off_eff',
+                     'T1_def_eff', 'T2_def_eff', 'T1_net_eff', 'T2_net_eff',
+                     'T1_efg_pct', 'T2_efg_pct', 'T1_to_rate', 'T2_to_rate',
+                     'T1_KP_ORtg', 'T2_KP_ORtg', 'T1_KP_DRtg', 'T2_KP_DRtg',
+                     'T1_KP_NetRtg', 'T2_KP_NetRtg', 'T1_KP_AdjTempo', 'T2_KP_AdjTempo',
+                     'matchup_edge', 'tempo_mismatch'], 'float64'),
+}
+
+
+def prediction_entry(row, agrees, winner_name, winner_seed, arch_matrix):
+    """One chatbot prediction dict from an EXPORT_DTYPES-typed row."""
+    pred_entry = {
+        'season': row.Season,
+        't1_id': row.T1_TeamID,
+        't2_id': row.T2_TeamID,
+        't1_name': row.T1_name,
+        't2_name': row.T2_name,
+        't1_seed': row.T1_seed,
+        't2_seed': row.T2_seed,
+        't1_archetype': row.T1_Archetype,
+        't2_archetype': row.T2_Archetype,
+        'model_win_prob': row.model_prob,
+        'predicted_margin': row.predicted_margin,
+        'value_score': row.value_score,
+        'seed_implied_prob': row.seed_implied_prob,
+        'actual_margin': row.PointDiff,
+        'actual_winner': 't1' if row.PointDiff > 0 else 't2',
+        'confidence': row.confidence,
+        'upset_flag': row.upset_flag,
+        'model_agrees_with_seed': agrees,
+        'predicted_winner_name': winner_name,
+        'predicted_winner_seed': winner_seed,
+        'archetype_matchup': {
+            't1_arch': row.T1_Archetype,
+            't2_arch': row.T2_Archetype,
+            'historical_wr': row.arch_matchup_wr,
+            'historical_n': row.arch_matchup_n,
+            'arch_edge': row.arch_matchup_edge,
+        },
+        'key_factors': {
+            'elo_diff': row.elo_diff,
+            't1_elo': row.T1_elo,
+            't2_elo': row.T2_elo,
+            't1_pyth': row.T1_pyth,
+            't2_pyth': row.T2_pyth,
+            't1_off_eff': row.T1_off_eff,
+            't2_off_eff': row.T2_off_eff,
+            't1_def_eff': row.T1_def_eff,
+            't2_def_eff': row.T2_def_eff,
+            't1_net_eff': row.T1_net_eff,
+            't2_net_eff': row.T2_net_eff,
+            't1_efg': row.T1_efg_pct,
+            't2_efg': row.T2_efg_pct,
+            't1_to_rate': row.T1_to_rate,
+            't2_to_rate': row.T2_to_rate,
+        },
+        'kenpom': {
+            't1_ortg': row.T1_KP_ORtg,
+            't2_ortg': row.T2_KP_ORtg,
+            't1_drtg': row.T1_KP_DRtg,
+            't2_drtg': row.T2_KP_DRtg,
+            't1_net': row.T1_KP_NetRtg,
+            't2_net': row.T2_KP_NetRtg,
+            't1_tempo': row.T1_KP_AdjTempo,
+            't2_tempo': row.T2_KP_AdjTempo,
+            'matchup_edge': row.matchup_edge,
+            'tempo_mismatch': row.tempo_mismatch,
+        },
+    }
+    pred_entry['responses'] = generate_chatbot_responses(pred_entry, arch_matrix)
+    return pred_entry
+
+
 def export_step1_json(result, teams, arch_matrix, archetype_base, team_stats, kenpom, output_dir):
     """Export chatbot_predictions_base.json and team_profiles.json from Step 1."""
     print("\n💾 STEP 1 EXPORT: Predictions + Team Profiles...")
@@ -974,147 +1675,100 @@ def export_step1_json(result, teams, arch_matrix, archetype_base, team_stats, ke
         preds = preds.merge(t1_names[['T1_TeamID', 'T1_name']], on='T1_TeamID', how='left')
         preds = preds.merge(t2_names[['T2_TeamID', 'T2_name']], on='T2_TeamID', how='left')
 
+    # Export-only copy where missing columns/values get their JSON default once, up front;
+    # preds keeps its schema and NaNs for full_predictions.csv
+    export = preds[[c for c in EXPORT_DTYPES if c in preds.columns]]
+    export = export.assign(**{col: default for col, default in PREDICTION_DEFAULTS.items()
+                              if col not in export.columns})
+    export = export.fillna(PREDICTION_DEFAULTS)
+    export['confidence'] = confidence_tiers(export['model_prob'])
+    export['upset_flag'] = upset_flags(export['T1_seed'], export['T2_seed'], export['model_prob'])
+
     # --- chatbot_predictions_base.json ---
     chatbot_data = {
         'model_version': 'v5_unified_pipeline',
         'generated_at': datetime.now().isoformat(),
-        'backtest_season': int(preds['Season'].iloc[0]) if len(preds) > 0 else 0,
+        'backtest_season': int(export['Season'].iloc[0]) if len(export) > 0 else 0,
         'model_accuracy': float(result['accuracy']),
         'model_brier': float(result['brier']),
         'features_used': result['features'],
-        'archetype_matchup_matrix': {k: {kk: float(vv) if isinstance(vv, (float, np.floating)) else vv
-                                          for kk, vv in v.items()}
-                                     for k, v in arch_matrix.items()},
+        # to_dict('index') already yields native ints/floats, ready to serialize
+        'archetype_matchup_matrix': arch_matrix,
         'espn_scoring': Config.ESPN_SCORING,
         'predictions': [],
     }
 
-    for _, row in preds.iterrows():
-        t1_seed = int(row.get('T1_seed', 0))
-        t2_seed = int(row.get('T2_seed', 0))
-        model_prob = float(row.get('model_prob', 0.5))
-
-        pred_entry = {
-            'season': int(row['Season']),
-            't1_id': int(row['T1_TeamID']),
-            't2_id': int(row['T2_TeamID']),
-            't1_name': str(row.get('T1_name', 'Unknown')),
-            't2_name': str(row.get('T2_name', 'Unknown')),
-            't1_seed': t1_seed,
-            't2_seed': t2_seed,
-            't1_archetype': str(row.get('T1_Archetype', 'Unknown')),
-            't2_archetype': str(row.get('T2_Archetype', 'Unknown')),
-            'model_win_prob': model_prob,
-            'predicted_margin': float(row.get('predicted_margin', 0)),
-            'value_score': float(row.get('value_score', 0)),
-            'seed_implied_prob': float(row.get('seed_implied_prob', 0.5)),
-            'actual_margin': float(row.get('PointDiff', 0)),
-            'actual_winner': 't1' if row.get('PointDiff', 0) > 0 else 't2',
-            'confidence': get_confidence_tier(model_prob),
-            'upset_flag': get_upset_flag(t1_seed, t2_seed, model_prob),
-            'model_agrees_with_seed': bool((model_prob > 0.5) == (t1_seed < t2_seed)),
-            'predicted_winner_name': str(row.get('T1_name', 'Unknown')) if model_prob > 0.5 else str(row.get('T2_name', 'Unknown')),
-            'predicted_winner_seed': t1_seed if model_prob > 0.5 else t2_seed,
-            'archetype_matchup': {
-                't1_arch': str(row.get('T1_Archetype', 'Unknown')),
-                't2_arch': str(row.get('T2_Archetype', 'Unknown')),
-                'historical_wr': float(row.get('arch_matchup_wr', 0.5)),
-                'historical_n': int(row.get('arch_matchup_n', 0)),
-                'arch_edge': float(row.get('arch_matchup_edge', 0)),
-            },
-            'key_factors': {
-                'elo_diff': float(row.get('elo_diff', 0)),
-                't1_elo': float(row.get('T1_elo', 1000)),
-                't2_elo': float(row.get('T2_elo', 1000)),
-                't1_pyth': float(row.get('T1_pyth', 0.5)),
-                't2_pyth': float(row.get('T2_pyth', 0.5)),
-                't1_off_eff': float(row.get('T1_off_eff', 100)),
-                't2_off_eff': float(row.get('T2_off_eff', 100)),
-                't1_def_eff': float(row.get('T1_def_eff', 100)),
-                't2_def_eff': float(row.get('T2_def_eff', 100)),
-                't1_net_eff': float(row.get('T1_net_eff', 0)),
-                't2_net_eff': float(row.get('T2_net_eff', 0)),
-                't1_efg': float(row.get('T1_efg_pct', 0.45)),
-                't2_efg': float(row.get('T2_efg_pct', 0.45)),
-                't1_to_rate': float(row.get('T1_to_rate', 0.15)),
-                't2_to_rate': float(row.get('T2_to_rate', 0.15)),
-            },
-            'kenpom': {
-                't1_ortg': float(row.get('T1_KP_ORtg', 0)),
-                't2_ortg': float(row.get('T2_KP_ORtg', 0)),
-                't1_drtg': float(row.get('T1_KP_DRtg', 0)),
-                't2_drtg': float(row.get('T2_KP_DRtg', 0)),
-                't1_net': float(row.get('T1_KP_NetRtg', 0)),
-                't2_net': float(row.get('T2_KP_NetRtg', 0)),
-                't1_tempo': float(row.get('T1_KP_AdjTempo', 0)),
-                't2_tempo': float(row.get('T2_KP_AdjTempo', 0)),
-                'matchup_edge': float(row.get('matchup_edge', 0)),
-                'tempo_mismatch': float(row.get('tempo_mismatch', 0)),
-            },
-        }
-        pred_entry['responses'] = generate_chatbot_responses(pred_entry, arch_matrix)
-        chatbot_data['predictions'].append(pred_entry)
+    # Pick-related fields for every game at once; the loop only packs them
+    t1_favored = export['model_prob'].to_numpy(dtype=np.float64) > 0.5
+    t1_seeds = export['T1_seed'].to_numpy(dtype=np.int64)
+    t2_seeds = export['T2_seed'].to_numpy(dtype=np.int64)
+    agrees_with_seed = (t1_favored == (t1_seeds < t2_seeds)).tolist()
+    winner_names = np.where(t1_favored, export['T1_name'].astype(str),
+                            export['T2_name'].astype(str)).tolist()
+    winner_seeds = np.where(t1_favored, t1_seeds, t2_seeds).tolist()
+
+    # Typed copy of just the exported columns, so rows yield ready Python scalars;
+    # preds itself keeps its dtypes for full_predictions.csv
+    rows = export[list(EXPORT_DTYPES)].astype(EXPORT_DTYPES)
+    chatbot_data['predictions'] = [
+        prediction_entry(row, agrees, winner_name, winner_seed, arch_matrix)
+        for row, agrees, winner_name, winner_seed in zip(
+            rows.itertuples(index=False, name='Pred'),
+            agrees_with_seed, winner_names, winner_seeds)
+    ]
 
     pred_path = output_dir / 'chatbot_predictions_base.json'
-    with open(pred_path, 'w') as f:
-        json.dump(chatbot_data, f, indent=2, cls=NumpyEncoder)
+    write_json(pred_path, chatbot_data)
 
     preds.to_csv(output_dir / 'full_predictions.csv', index=False)
 
     # --- team_profiles.json ---
     season = Config.BACKTEST_SEASON
-    season_stats = team_stats[team_stats['Season'] == season].copy() if season in team_stats['Season'].values else team_stats[team_stats['Season'] == team_stats['Season'].max()].copy()
-    season_archetypes = archetype_base[archetype_base['Season'] == season].copy() if season in archetype_base['Season'].values else archetype_base[archetype_base['Season'] == archetype_base['Season'].max()].copy()
+    # Read-only season slices (latest season when the backtest season is absent)
+    def season_rows(df):
+        mask = df['Season'].eq(season)
+        return df.loc[mask] if mask.any() else df.loc[df['Season'].eq(df['Season'].max())]
+
+    season_stats = season_rows(team_stats)
+    season_archetypes = season_rows(archetype_base)
+
+    # Index per-team lookups once instead of filtering whole frames per team
+    name_by_team = {}
+    if not teams.empty:
+        first_names = teams.drop_duplicates('TeamID', keep='first')
+        name_by_team = dict(zip(first_names['TeamID'].astype(int), first_names['TeamName']))
+    archetype_by_team = dict(zip(
+        season_archetypes['TeamID'].astype(int),
+        season_archetypes['Archetype'].astype(str)))
+    kp_by_team = {}
+    if kenpom is not None:
+        kp_season = kenpom[(kenpom['Season'] == season) & kenpom['TeamID'].notna()]
+        kp_season = kp_season.drop_duplicates('TeamID', keep='first')
+        kp_cols = [c for c in kenpom.columns if c not in ['Season', 'TeamID', 'TeamName']]
+        # Missing KenPom values export as 0, the rest as floats
+        kp_records = kp_season[kp_cols].astype(np.float64).to_dict('records')
+        kp_by_team = dict(zip(kp_season['TeamID'].astype(int),
+                              [{col: val if val == val else 0 for col, val in rec.items()}
+                               for rec in kp_records]))
+
+    # Absent stat columns take their profile default; present ones export as floats
+    stat_frame = season_stats.assign(**{col: default for col, default in PROFILE_STAT_DEFAULTS.items()
+                                        if col not in season_stats.columns})
+    stat_records = stat_frame[list(PROFILE_STAT_DEFAULTS)].astype(np.float64).to_dict('records')
+    team_ids = season_stats['TeamID'].astype(int).tolist()
 
     profiles = []
-    for _, row in season_stats.iterrows():
-        team_id = int(row['TeamID'])
-        team_name = 'Unknown'
-        if not teams.empty:
-            match = teams[teams['TeamID'] == team_id]
-            if len(match) > 0:
-                team_name = match.iloc[0]['TeamName']
-
-        # Get archetype
-        arch_row = season_archetypes[season_archetypes['TeamID'] == team_id]
-        archetype = str(arch_row['Archetype'].iloc[0]) if len(arch_row) > 0 else 'The Unknown'
-
-        # Get KenPom stats
-        kp_stats = {}
-        if kenpom is not None:
-            kp_row = kenpom[(kenpom['Season'] == season) & (kenpom['TeamID'] == team_id)]
-            if len(kp_row) > 0:
-                kp_row = kp_row.iloc[0]
-                for col in kenpom.columns:
-                    if col not in ['Season', 'TeamID', 'TeamName']:
-                        val = kp_row[col]
-                        kp_stats[col] = float(val) if pd.notna(val) else 0
-
-        profile = {
+    for team_id, stats in zip(team_ids, stat_records):
+        archetype = archetype_by_team.get(team_id, 'The Unknown')
+        profiles.append({
             'team_id': team_id,
-            'name': team_name,
+            'name': name_by_team.get(team_id, 'Unknown'),
             'season': int(season),
             'archetype': archetype,
             'archetype_description': ArchetypeEngine.ARCHETYPE_DESCRIPTIONS.get(archetype, ''),
-            'stats': {
-                'win_pct': float(row.get('win_pct', 0.5)),
-                'ppg': float(row.get('ppg', 70)),
-                'opp_ppg': float(row.get('opp_ppg', 70)),
-                'point_diff': float(row.get('point_diff', 0)),
-                'pyth': float(row.get('pyth', 0.5)),
-                'off_eff': float(row.get('off_eff', 100)),
-                'def_eff': float(row.get('def_eff', 100)),
-                'net_eff': float(row.get('net_eff', 0)),
-                'efg_pct': float(row.get('efg_pct', 0.45)),
-                'to_rate': float(row.get('to_rate', 0.15)),
-                'ft_rate': float(row.get('ft_rate', 0.30)),
-                'oreb_pct': float(row.get('oreb_pct', 0.30)),
-                'three_rate': float(row.get('three_rate', 0.30)),
-                'tempo': float(row.get('tempo', 65)),
-            },
-            'kenpom': kp_stats,
-        }
-        profiles.append(profile)
+            'stats': stats,
+            'kenpom': dict(kp_by_team.get(team_id, {})),
+        })
 
     profiles_data = {
         'description': f'Team profiles for {season} season — auto-generated by BracketGPT pipeline',
@@ -1124,8 +1778,7 @@ def export_step1_json(result, teams, arch_matrix, archetype_base, team_stats, ke
     }
 
     profiles_path = output_dir / 'team_profiles.json'
-    with open(profiles_path, 'w') as f:
-        json.dump(profiles_data, f, indent=2, cls=NumpyEncoder)
+    write_json(profiles_path, profiles_data)
 
     # --- archetype_summary.json ---
     arch_summary = {
@@ -1133,8 +1786,7 @@ def export_step1_json(result, teams, arch_matrix, archetype_base, team_stats, ke
         'matchup_matrix': {k: v for k, v in arch_matrix.items() if v.get('total', 0) >= 3},
     }
     arch_path = output_dir / 'archetype_summary.json'
-    with open(arch_path, 'w') as f:
-        json.dump(arch_summary, f, indent=2, cls=NumpyEncoder)
+    write_json(arch_path, arch_summary)
 
     upsets = sum(1 for p in chatbot_data['predictions'] if p['upset_flag'] != 'chalk')
     print(f"   ✅ {len(chatbot_data['predictions'])} predictions → {pred_path.name}")
@@ -1149,15 +1801,20 @@ def export_step1_json(result, teams, arch_matrix, archetype_base, team_stats, ke
 #                        STEP 2: INJURIES + ON/OFF PATCHING
 # #############################################################################
 
+def team_star_index(df: pd.DataFrame) -> pd.Series:
+    """Row label of each team's star: top weighted_bpm, first-listed player on ties."""
+    return df.groupby("team", sort=True)["weighted_bpm"].idxmax()
+
+
 def fetch_player_stats(year):
     """Pull player stats from Barttorvik for BPM-based on/off proxies."""
     url = f"https://barttorvik.com/playerstat.php?year={year}&json=1"
     print(f"   Fetching player stats ({year}) from Barttorvik...")
 
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=20)
+        resp = HTTP_SESSION.get(url, timeout=20)
         resp.raise_for_status()
-        data = resp.json()
+        data = parse_json(resp.content)
     except Exception as e:
         print(f"   ⚠️ Barttorvik fetch failed: {e}")
         print("   → Using empty player data. On/off features will be skipped.")
@@ -1173,40 +1830,50 @@ def fetch_player_stats(year):
         "mpg", "ppg", "apg", "rpg",
     ]
     n = len(data[0]) if data else len(columns)
-    df = pd.DataFrame(data, columns=columns[:n])
+    df = pd.DataFrame.from_records(data, columns=columns[:n])
     df["year"] = year
 
-    for col in ["bpm", "obpm", "dbpm", "min_pct", "usg", "ppg", "mpg", "ortg"]:
-        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+    numeric = ["bpm", "obpm", "dbpm", "min_pct", "usg", "ppg", "mpg", "ortg"]
+    df[numeric] = df[numeric].apply(pd.to_numeric, errors="coerce").fillna(0)
 
     # Compute weighted BPM + team dependency
     df["weighted_bpm"] = df["bpm"] * (df["min_pct"] / 100)
 
-    team_rows = []
-    for team, grp in df.groupby("team"):
-        s = grp.sort_values("weighted_bpm", ascending=False)
-        pos = s[s["weighted_bpm"] > 0]
-        total = pos["weighted_bpm"].sum()
-        top1 = float(s["weighted_bpm"].iloc[0]) if len(s) > 0 else 0
-        top2 = float(s["weighted_bpm"].iloc[:2].sum()) if len(s) > 1 else top1
-
-        team_rows.append({
-            "team": team,
-            "team_total_bpm": round(total, 3),
-            "star_player": s["player"].iloc[0] if len(s) > 0 else "",
-            "star_player_bpm": round(top1, 3),
-            "star_player_usg": round(float(s["usg"].iloc[0]), 1) if len(s) > 0 else 0,
-            "star_player_ppg": round(float(s["ppg"].iloc[0]), 1) if len(s) > 0 else 0,
-            "star_dependency_pct": round((top1 / total * 100) if total > 0 else 50, 1),
-            "top2_dependency_pct": round((top2 / total * 100) if total > 0 else 50, 1),
-        })
-
-    team_dep = pd.DataFrame(team_rows)
+    # Top weighted-BPM player per team is the star (team_star_index breaks ties by
+    # Barttorvik listing order); the two best give top-2 dependency
+    ranked = df[df["team"].notna()].sort_values(
+        ["team", "weighted_bpm"], ascending=[True, False], kind="stable")
+    by_team = ranked.groupby("team", sort=True)
+    star = df.loc[team_star_index(ranked)].set_index("team")
+    # Per-team totals over the positive rows with numpy's own sum, as Series.sum gives;
+    # grouped sums accumulate differently and flip round(..., 3) at the last digit
+    pos = ranked[ranked["weighted_bpm"] > 0]
+    pos_teams, starts = np.unique(pos["team"].to_numpy(), return_index=True)
+    pos_sums = [seg.sum() for seg in np.split(pos["weighted_bpm"].to_numpy(dtype=np.float64), starts[1:])]
+    total = pd.Series(pos_sums, index=pos_teams, dtype=np.float64).reindex(star.index, fill_value=0.0)
+    top1 = star["weighted_bpm"].to_numpy(dtype=np.float64)
+    top2 = by_team.head(2).groupby("team")["weighted_bpm"].sum().to_numpy(dtype=np.float64)
+    has_pos = total.to_numpy() > 0
+    safe_total = np.where(has_pos, total.to_numpy(), 1.0)
+
+    team_dep = pd.DataFrame({
+        "team": star.index.to_numpy(),
+        "team_total_bpm": np.round(total.to_numpy(), 3),
+        "star_player": star["player"].to_numpy(),
+        "star_player_bpm": [round(v, 3) for v in top1.tolist()],
+        "star_player_usg": [round(v, 1) for v in star["usg"].astype(float).tolist()],
+        "star_player_ppg": [round(v, 1) for v in star["ppg"].astype(float).tolist()],
+        "star_dependency_pct": np.where(has_pos, np.round(top1 / safe_total * 100, 1), 50),
+        "top2_dependency_pct": np.where(has_pos, np.round(top2 / safe_total * 100, 1), 50),
+    })
     df = df.merge(team_dep, on="team", how="left")
     print(f"   → {len(df):,} players, {len(team_dep)} teams loaded")
     return df, team_dep
 
 
+INJURY_SEVERITY = {"Out": 3, "Doubtful": 2, "Questionable": 2, "Day-To-Day": 1, "GTD": 1}
+
+
 def fetch_injuries_espn():
     """Fetch current injuries from ESPN's unofficial API."""
     url = "https://site.api.espn.com/apis/site/v2/sports/basketball/mens-college-basketball/injuries"
@@ -1214,9 +1881,9 @@ def fetch_injuries_espn():
     records = []
 
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=15)
+        resp = HTTP_SESSION.get(url, timeout=15)
         resp.raise_for_status()
-        data = resp.json()
+        data = parse_json(resp.content)
 
         for team_entry in data.get("injuries", []):
             team_name = team_entry.get("team", {}).get("displayName", "")
@@ -1242,8 +1909,9 @@ def fetch_injuries_espn():
     cols = ["team_espn", "team_abbr", "player", "position", "injury_status",
             "injury_type", "injury_detail", "return_date", "short_comment"]
     df = pd.DataFrame(records) if records else pd.DataFrame(columns=cols)
-    severity_map = {"Out": 3, "Doubtful": 2, "Questionable": 2, "Day-To-Day": 1, "GTD": 1}
-    df["severity"] = df["injury_status"].map(severity_map).fillna(1).astype(int)
+    # Status codes index the severity table; unknown statuses (code -1) hit the trailing 1
+    codes = pd.Index(list(INJURY_SEVERITY)).get_indexer(df["injury_status"])
+    df["severity"] = np.array([*INJURY_SEVERITY.values(), 1], dtype=np.int8)[codes]
 
     print(f"   → {len(df)} injured players found")
     return df
@@ -1270,44 +1938,67 @@ def merge_injury_impact(player_df, injury_df):
     df["injury_status"] = df["injury_status"].fillna("")
 
     sev_weight = {3: 1.0, 2: 0.5, 1: 0.2, 0: 0.0}
-    df["injury_bpm_impact"] = df.apply(
-        lambda r: round(r["weighted_bpm"] * sev_weight.get(r["injury_severity"], 0), 4)
-        if r["is_injured"] else 0.0, axis=1
-    )
+    impact = np.zeros(len(df))
+    hurt = df["is_injured"].to_numpy(dtype=bool)
+    raw = (df["weighted_bpm"].to_numpy()[hurt]
+           * df["injury_severity"].map(sev_weight).fillna(0).to_numpy()[hurt])
+    # Python round() (correctly rounded) on the injured few keeps the exported values exact
+    impact[hurt] = [round(float(v), 4) for v in raw]
+    df["injury_bpm_impact"] = impact
     return df
 
 
+# Team-level on/off columns carried from fetch_player_stats, with their fallbacks
+TEAM_ONOFF_DEFAULTS = {
+    "star_player": "", "star_player_bpm": 0, "star_player_usg": 0, "star_player_ppg": 0,
+    "star_dependency_pct": 50, "top2_dependency_pct": 50, "team_total_bpm": 0,
+}
+
+
 def build_team_summary(merged, tournament_teams):
-    records = []
-    for team, grp in merged.groupby("team"):
-        injured = grp[grp["is_injured"] == True]
-        top = grp.sort_values("weighted_bpm", ascending=False)
-        star = top.iloc[0] if len(top) > 0 else None
-        star_injured = bool(star is not None and star["is_injured"])
-
-        records.append({
-            "team": team,
-            "star_player": str(grp["star_player"].iloc[0]) if "star_player" in grp.columns else "",
-            "star_player_bpm": float(grp["star_player_bpm"].iloc[0]) if "star_player_bpm" in grp.columns else 0,
-            "star_player_usg": float(grp["star_player_usg"].iloc[0]) if "star_player_usg" in grp.columns else 0,
-            "star_player_ppg": float(grp["star_player_ppg"].iloc[0]) if "star_player_ppg" in grp.columns else 0,
-            "star_dependency_pct": float(grp["star_dependency_pct"].iloc[0]) if "star_dependency_pct" in grp.columns else 50,
-            "top2_dependency_pct": float(grp["top2_dependency_pct"].iloc[0]) if "top2_dependency_pct" in grp.columns else 50,
-            "team_total_bpm": float(grp["team_total_bpm"].iloc[0]) if "team_total_bpm" in grp.columns else 0,
-            "star_is_injured": star_injured,
-            "n_injured": len(injured),
-            "n_out": len(injured[injured["injury_severity"] == 3]),
-            "n_questionable": len(injured[injured["injury_severity"] == 2]),
-            "team_total_injury_bpm": round(float(injured["injury_bpm_impact"].sum()), 4),
-            "star_injury_bpm": round(float(
-                injured[injured["player"] == (str(star["player"]) if star is not None else "")
-                        ]["injury_bpm_impact"].sum()), 4) if star_injured else 0.0,
-            "injured_players_list": ", ".join(injured["player"].tolist()),
-            "injured_statuses": ", ".join(
-                f"{r['player']} ({r['injury_status']})" for _, r in injured.iterrows()),
-        })
+    merged = merged[merged["team"].notna()]
+    heads = merged.drop_duplicates("team").set_index("team").sort_index()
+    teams_idx = heads.index
+
+    df = pd.DataFrame({"team": teams_idx})
+    for col, default in TEAM_ONOFF_DEFAULTS.items():
+        if col not in heads.columns:
+            df[col] = default
+        elif col == "star_player":
+            df[col] = heads[col].astype(str).to_numpy()
+        else:
+            df[col] = heads[col].astype(float).to_numpy()
+
+    # Star = top weighted-BPM player, with the same tie rule as fetch_player_stats
+    star_rows = merged.loc[team_star_index(merged).reindex(teams_idx)]
+    df["star_is_injured"] = star_rows["is_injured"].astype(bool).to_numpy()
+
+    injured = merged[merged["is_injured"] == True]
+    inj_by_team = injured.groupby("team")
+    star_name = pd.Series(star_rows["player"].astype(str).to_numpy(), index=teams_idx)
+    is_star = injured["player"].astype(str).to_numpy() == injured["team"].map(star_name).to_numpy()
+    counts = pd.DataFrame({
+        "n_injured": inj_by_team.size(),
+        "n_out": (injured["injury_severity"] == 3).groupby(injured["team"]).sum(),
+        "n_questionable": (injured["injury_severity"] == 2).groupby(injured["team"]).sum(),
+    }).reindex(teams_idx, fill_value=0)
+    for col in counts.columns:
+        df[col] = counts[col].astype(np.int64).to_numpy()
+
+    total_bpm = inj_by_team["injury_bpm_impact"].sum().reindex(teams_idx, fill_value=0.0)
+    star_bpm = injured["injury_bpm_impact"].where(is_star, 0.0).groupby(injured["team"]).sum()
+    star_bpm = star_bpm.reindex(teams_idx, fill_value=0.0)
+    df["team_total_injury_bpm"] = [round(float(v), 4) for v in total_bpm]
+    df["star_injury_bpm"] = [round(float(v), 4) if hurt else 0.0
+                             for v, hurt in zip(star_bpm, df["star_is_injured"])]
+
+    players = injured["player"].astype(str)
+    df["injured_players_list"] = players.groupby(injured["team"]).agg(", ".join).reindex(
+        teams_idx, fill_value="").to_numpy()
+    statuses = players + " (" + injured["injury_status"].astype(str) + ")"
+    df["injured_statuses"] = statuses.groupby(injured["team"]).agg(", ".join).reindex(
+        teams_idx, fill_value="").to_numpy()
 
-    df = pd.DataFrame(records)
     df["upset_vulnerability"] = (
         (df["star_dependency_pct"] * 0.4) +
         (df["team_total_injury_bpm"] * 10).clip(0, 30) +
@@ -1317,20 +2008,21 @@ def build_team_summary(merged, tournament_teams):
     return df[df["team"].isin(tournament_teams)].copy().reset_index(drop=True)
 
 
-def compute_injury_adj(row):
-    if row is None:
-        return 0.0
-    adj = 0.0
-    if row.get("star_is_injured", False):
-        dep = float(row.get("star_dependency_pct", 50)) / 100
-        bpm = float(row.get("star_player_bpm", 0))
-        bpm_factor = min(bpm / 4.0, 1.0)
-        scale = 0.12 if dep >= 0.50 else 0.07
-        adj -= scale * bpm_factor * dep
-    total_inj = float(row.get("team_total_injury_bpm", 0))
-    total_bpm = float(row.get("team_total_bpm", 1)) or 1
-    adj -= 0.08 * min(total_inj / total_bpm, 0.5)
-    return round(float(np.clip(adj, -0.15, 0.0)), 4)
+def injury_adjustments(team_summary):
+    """Win-prob adjustment per team row: star injury scaled by dependency, plus team BPM lost."""
+    def col(name, default):
+        if name not in team_summary.columns:
+            return np.full(len(team_summary), float(default))
+        return team_summary[name].to_numpy(dtype=np.float64)
+
+    dep = col("star_dependency_pct", 50) / 100
+    bpm_factor = np.minimum(col("star_player_bpm", 0) / 4.0, 1.0)
+    scale = np.where(dep >= 0.50, 0.12, 0.07)
+    star_hit = np.where(col("star_is_injured", False).astype(bool), scale * bpm_factor * dep, 0.0)
+    total_bpm = col("team_total_bpm", 1)
+    total_bpm = np.where(total_bpm == 0, 1.0, total_bpm)
+    adj = 0.0 - star_hit - 0.08 * np.minimum(col("team_total_injury_bpm", 0) / total_bpm, 0.5)
+    return np.array([round(float(v), 4) for v in np.clip(adj, -0.15, 0.0)])
 
 
 def get_confidence(prob):
@@ -1366,6 +2058,37 @@ def depth_label(dep):
     return "Deep — distributed throughout roster"
 
 
+DEPTH_THRESHOLDS = np.array([30, 45, 60])
+DEPTH_LABELS = np.array([
+    "Deep — distributed throughout roster",
+    "Balanced — shared offensive load",
+    "Star-Led — above average dependency",
+    "One-Man Show — very star dependent",
+], dtype=object)
+
+
+def depth_labels(deps) -> np.ndarray:
+    """Vectorized depth_label over star-dependency percentages (NaN reads as Deep)."""
+    d = np.asarray(deps, dtype=np.float64)
+    idx = np.searchsorted(DEPTH_THRESHOLDS, d, side='right')
+    return DEPTH_LABELS[np.where(np.isnan(d), 0, idx)]
+
+
+STEP2_OUTPUTS = ('chatbot_predictions_base.json', 'team_profiles.json')
+
+
+def step2_fingerprint(output_dir: Path, year, player_df, injury_df) -> str:
+    """sha256 over the fetched feeds and the Step 2 output files as they are on disk."""
+    h = hashlib.sha256(str(year).encode())
+    for df in (player_df, injury_df):
+        h.update(",".join(map(str, df.columns)).encode())
+        h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    for fname in STEP2_OUTPUTS:
+        path = output_dir / fname
+        h.update(path.read_bytes() if path.exists() else b"")
+    return h.hexdigest()
+
+
 def build_injury_ctx(row, team_name):
     if row is None:
         return {"team": team_name, "has_injuries": False, "star_is_injured": False,
@@ -1418,6 +2141,16 @@ def run_step2(chatbot_data, profiles_data, output_dir, year):
         print("   ⚠️ No player data — skipping Step 2 patching.")
         return chatbot_data, profiles_data
 
+    # Same feeds and outputs still as the last Step 2 wrote them: nothing to re-patch
+    hash_path = output_dir / '.step2.hash'
+    try:
+        unchanged = hash_path.read_text().strip() == step2_fingerprint(output_dir, year, player_df, injury_df)
+    except Exception:
+        unchanged = False
+    if unchanged:
+        print("   ⚡ On/off and injury feeds unchanged since the last Step 2 — outputs left as is.")
+        return chatbot_data, profiles_data
+
     # Merge + summarize
     merged_df = merge_injury_impact(player_df, injury_df)
     team_summary = build_team_summary(merged_df, Config.TOURNAMENT_TEAMS)
@@ -1433,19 +2166,31 @@ def run_step2(chatbot_data, profiles_data, output_dir, year):
 
     # --- Patch predictions ---
     predictions = chatbot_data.get("predictions", [])
-    lookup = {row["team"].lower().strip(): row for _, row in team_summary.iterrows()}
+    # Plain dict records keyed by normalized name; later duplicates win, as before
+    lookup = dict(zip(team_summary["team"].str.lower().str.strip(),
+                      team_summary.assign(
+                          injury_adj=injury_adjustments(team_summary),
+                          depth_label=depth_labels(team_summary["star_dependency_pct"].astype(float)),
+                      ).to_dict("records")))
+
+    def name_keys(records, field):
+        return pd.Series([r.get(field, "") for r in records], dtype=object).str.lower().str.strip()
+
+    # Probability adjustments for every matchup at once; the loop packs contexts/responses
+    t1_keys, t2_keys = name_keys(predictions, "t1_name"), name_keys(predictions, "t2_name")
+    adj_of = {key: row["injury_adj"] for key, row in lookup.items()}
+    t1_adjs = t1_keys.map(adj_of).fillna(0.0).to_numpy(dtype=np.float64)
+    t2_adjs = t2_keys.map(adj_of).fillna(0.0).to_numpy(dtype=np.float64)
+    bases = np.array([float(p.get("model_win_prob", 0.5)) for p in predictions], dtype=np.float64)
+    adjusted = np.clip(bases + t1_adjs - t2_adjs, 0.02, 0.98)
 
     patched_n = flipped_n = 0
-    for pred in predictions:
-        t1 = pred.get("t1_name", "").lower().strip()
-        t2 = pred.get("t2_name", "").lower().strip()
+    for pred, t1, t2, t1_adj, t2_adj, base, adj in zip(
+            predictions, t1_keys, t2_keys, t1_adjs.tolist(), t2_adjs.tolist(),
+            bases.tolist(), adjusted.tolist()):
         r1 = lookup.get(t1)
         r2 = lookup.get(t2)
-
-        t1_adj = compute_injury_adj(r1)
-        t2_adj = compute_injury_adj(r2)
-        base = float(pred.get("model_win_prob", 0.5))
-        adj = round(float(np.clip(base + t1_adj - t2_adj, 0.02, 0.98)), 5)
+        adj = round(adj, 5)
 
         t1_ctx = build_injury_ctx(r1, pred.get("t1_name", ""))
         t2_ctx = build_injury_ctx(r2, pred.get("t2_name", ""))
@@ -1476,10 +2221,10 @@ def run_step2(chatbot_data, profiles_data, output_dir, year):
         if r1 is not None or r2 is not None:
             dep_lines = []
             if r1 is not None:
-                dep_lines.append(f"{pred.get('t1_name','T1')}: {depth_label(float(r1.get('star_dependency_pct',50)))} "
+                dep_lines.append(f"{pred.get('t1_name','T1')}: {r1['depth_label']} "
                                 f"(star: {r1.get('star_player','?')} — {r1.get('star_player_ppg',0):.1f} ppg)")
             if r2 is not None:
-                dep_lines.append(f"{pred.get('t2_name','T2')}: {depth_label(float(r2.get('star_dependency_pct',50)))} "
+                dep_lines.append(f"{pred.get('t2_name','T2')}: {r2['depth_label']} "
                                 f"(star: {r2.get('star_player','?')} — {r2.get('star_player_ppg',0):.1f} ppg)")
             pred.setdefault("responses", {})["depth"] = " | ".join(dep_lines)
 
@@ -1488,8 +2233,7 @@ def run_step2(chatbot_data, profiles_data, output_dir, year):
 
     # --- Patch team profiles ---
     profiles = profiles_data.get("profiles", [])
-    for profile in profiles:
-        name = profile.get("name", "").lower().strip()
+    for profile, name in zip(profiles, name_keys(profiles, "name")):
         row = lookup.get(name)
 
         if row is not None:
@@ -1502,7 +2246,7 @@ def run_step2(chatbot_data, profiles_data, output_dir, year):
                 "star_dependency_pct": dep,
                 "top2_dependency_pct": float(row.get("top2_dependency_pct", 50)),
                 "team_total_bpm": float(row.get("team_total_bpm", 0)),
-                "depth_label": depth_label(dep),
+                "depth_label": row["depth_label"],
             }
             profile["injuries"] = {
                 "has_injuries": bool(row.get("n_injured", 0) > 0),
@@ -1521,11 +2265,12 @@ def run_step2(chatbot_data, profiles_data, output_dir, year):
     profiles_data["injury_data_included"] = True
 
     # Save patched versions
-    with open(output_dir / 'chatbot_predictions_base.json', 'w') as f:
-        json.dump(chatbot_data, f, indent=2, cls=NumpyEncoder)
-
-    with open(output_dir / 'team_profiles.json', 'w') as f:
-        json.dump(profiles_data, f, indent=2, cls=NumpyEncoder)
+    write_json(output_dir / 'chatbot_predictions_base.json', chatbot_data)
+    write_json(output_dir / 'team_profiles.json', profiles_data)
+    try:
+        hash_path.write_text(step2_fingerprint(output_dir, year, player_df, injury_df) + "\n")
+    except Exception as exc:
+        print(f"   ⚠️ Could not record Step 2 fingerprint: {exc}")
 
     print(f"\n   ✅ {patched_n} predictions adjusted for injuries")
     print(f"   ✅ {flipped_n} picks FLIPPED by injury adjustment")
@@ -1534,10 +2279,11 @@ def run_step2(chatbot_data, profiles_data, output_dir, year):
     # Print injury summary
     if len(injured_teams) > 0:
         print(f"\n   🚑 Injured tournament teams:")
-        for _, r in injured_teams.sort_values("upset_vulnerability", ascending=False).head(10).iterrows():
-            star_flag = "⭐ STAR" if r["star_is_injured"] else "      "
-            print(f"      {star_flag}  {r['team']:<25} vuln={r['upset_vulnerability']:.0f}  "
-                  f"→ {r['injured_statuses']}")
+        top = injured_teams.nlargest(10, "upset_vulnerability")
+        for r in top[["team", "upset_vulnerability", "star_is_injured", "injured_statuses"]].itertuples(index=False):
+            star_flag = "⭐ STAR" if r.star_is_injured else "      "
+            print(f"      {star_flag}  {r.team:<25} vuln={r.upset_vulnerability:.0f}  "
+                  f"→ {r.injured_statuses}")
 
     return chatbot_data, profiles_data
 
@@ -1545,6 +2291,14 @@ def run_step2(chatbot_data, profiles_data, output_dir, year):
 # #############################################################################
 #                              MAIN
 # #############################################################################
+def file_size(path: Path):
+    """Size in bytes, or None if the file does not exist."""
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return None
+
+
 def main():
     t0 = time.time()
 
@@ -1555,12 +2309,21 @@ def main():
     parser.add_argument('--kenpom-path', default=None)
     parser.add_argument('--skip-step1', action='store_true', help='Skip model training, load existing predictions')
     parser.add_argument('--skip-step2', action='store_true', help='Skip injury/on-off patching')
+    parser.add_argument('--no-cache', action='store_true', help='Recompute Step 1 features instead of reusing outputs/cache')
+    parser.add_argument('--device', choices=['cpu', 'cuda', 'auto'], default='cpu',
+                        help='Booster training device; auto uses CUDA when XGBoost and a GPU are available')
+    parser.add_argument('--skip-training', action='store_true',
+                        help='Reuse the XGBoost/LightGBM models saved by the last Step 1 run')
+    parser.add_argument('--quiet', action='store_true', help='Skip diagnostic-only reports (archetype distribution)')
     args = parser.parse_args()
 
     Config.DATA_DIR = Path(args.data_dir)
     Config.OUTPUT_DIR = Path(args.output_dir)
     Config.BACKTEST_SEASON = args.backtest
     Config.KENPOM_PATH = args.kenpom_path
+    Config.CACHE_DIR = None if args.no_cache else Config.OUTPUT_DIR / 'cache'
+    Config.DEVICE, Config.LGB_DEVICE = resolve_device(args.device)
+    Config.SKIP_TRAINING = args.skip_training
 
     Config.OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -1587,21 +2350,25 @@ def main():
         print("📊 STEP 1: MODEL TRAINING + PREDICTION EXPORT")
         print("=" * 70)
 
-        regular, tourney, seeds, teams = load_data(Config.DATA_DIR)
-        kenpom = load_kenpom(args.kenpom_path, teams)
+        regular, tourney, seeds, teams = load_data(Config.DATA_DIR, Config.CACHE_DIR)
+        kenpom = get_kenpom(args.kenpom_path, teams, Config.CACHE_DIR)
 
-        elo_df = compute_elo(regular, args.backtest)
-        team_stats = compute_season_stats(regular)
+        elo_df = get_elo(regular, args.backtest, Config.CACHE_DIR)
+        team_stats = get_season_stats(regular, Config.CACHE_DIR)
 
-        td, arch_matrix, arch_encoder, archetype_base = build_matchup_features(
+        td, arch_matrix, arch_categories, archetype_base = build_matchup_features(
             tourney, team_stats, elo_df, seeds, kenpom, args.backtest)
 
-        if 'T1_Archetype' in td.columns:
+        if 'T1_Archetype' in td.columns and not args.quiet:
             print(f"\n🎭 ARCHETYPE DISTRIBUTION (Training Data):")
-            train_archs = td[td['Season'] < args.backtest]
-            all_archs = pd.concat([train_archs['T1_Archetype'], train_archs['T2_Archetype']])
-            for arch, count in all_archs.value_counts().head(15).items():
-                print(f"   {arch:<25} {count:>5} appearances")
+            # Both sides share arch_categories, so count codes instead of stacking the labels
+            train_mask = td['Season'].to_numpy() < args.backtest
+            codes = np.concatenate([td[col].cat.codes.to_numpy()[train_mask]
+                                    for col in ('T1_Archetype', 'T2_Archetype')])
+            counts = np.bincount(codes[codes >= 0], minlength=len(arch_categories))
+            for idx in np.argsort(-counts, kind='stable')[:15]:
+                if counts[idx]:
+                    print(f"   {arch_categories[idx]:<25} {counts[idx]:>5} appearances")
 
         result = train_model(td, args.backtest)
 
@@ -1612,15 +2379,13 @@ def main():
         pred_path = Config.OUTPUT_DIR / 'chatbot_predictions_base.json'
         prof_path = Config.OUTPUT_DIR / 'team_profiles.json'
         if pred_path.exists():
-            with open(pred_path) as f:
-                chatbot_data = json.load(f)
+            chatbot_data = parse_json(pred_path.read_bytes())
             print(f"   📂 Loaded existing predictions: {len(chatbot_data.get('predictions', []))} matchups")
         else:
             print(f"   ⚠️ No existing predictions at {pred_path}")
             return
         if prof_path.exists():
-            with open(prof_path) as f:
-                profiles_data = json.load(f)
+            profiles_data = parse_json(prof_path.read_bytes())
             print(f"   📂 Loaded existing profiles: {len(profiles_data.get('profiles', []))} teams")
         else:
             profiles_data = {"profiles": []}
@@ -1640,13 +2405,14 @@ def main():
     print("  ✅  BRACKETGPT PIPELINE COMPLETE")
     print("=" * 70)
 
-    # File sizes
-    for fname in ['chatbot_predictions_base.json', 'team_profiles.json',
-                   'archetype_summary.json', 'full_predictions.csv']:
-        fpath = Config.OUTPUT_DIR / fname
-        if fpath.exists():
-            kb = fpath.stat().st_size / 1024
-            print(f"  📄 {fname:<45} {kb:>7.1f} KB")
+    # File sizes: one stat per file, issued together (each is a round-trip on mounted volumes)
+    fnames = ['chatbot_predictions_base.json', 'team_profiles.json',
+              'archetype_summary.json', 'full_predictions.csv']
+    with ThreadPoolExecutor(max_workers=len(fnames)) as pool:
+        sizes = list(pool.map(file_size, (Config.OUTPUT_DIR / fname for fname in fnames)))
+    for fname, size in zip(fnames, sizes):
+        if size is not None:
+            print(f"  📄 {fname:<45} {size / 1024:>7.1f} KB")
 
     print(f"\n  ⏱️ Total time: {elapsed:.0f}s ({elapsed/60:.1f} min)")
 
@@ -0,0 +1,80 @@
+"""Step 2 star selection when two players tie on weighted BPM."""
+import importlib.util
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+PIPELINE = Path(__file__).resolve().parents[1] / "data" / "BracketGPT_Unified_Pipeline.py"
+
+
+@pytest.fixture(scope="module")
+def pipeline():
+    spec = importlib.util.spec_from_file_location("bracketgpt_pipeline", PIPELINE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def barttorvik_row(player, team, bpm, min_pct, usg, ppg):
+    row = [player, team, "ACC", 30, min_pct, 110.0, usg] + [0] * 27 + [bpm, 0, 0, 0, 30.0, ppg, 2.0, 4.0]
+    assert len(row) == 42
+    return row
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    @property
+    def content(self):
+        import json
+        return json.dumps(self.payload).encode()
+
+    def raise_for_status(self):
+        pass
+
+
+@pytest.fixture
+def tied_feed(pipeline, monkeypatch):
+    # Tied top weighted BPM (5.0 * 0.8 == 8.0 * 0.5) listed second and fourth
+    rows = [
+        barttorvik_row("Bench Guy", "Duke", 1.0, 40.0, 15.0, 4.0),
+        barttorvik_row("First Star", "Duke", 5.0, 80.0, 25.0, 18.0),
+        barttorvik_row("Role Player", "Duke", 2.0, 60.0, 18.0, 9.0),
+        barttorvik_row("Second Star", "Duke", 8.0, 50.0, 28.0, 15.0),
+        barttorvik_row("Solo", "Yale", 3.0, 70.0, 22.0, 12.0),
+    ]
+    monkeypatch.setattr(pipeline.HTTP_SESSION, "get", lambda *a, **k: FakeResponse(rows))
+    return rows
+
+
+def test_fetch_player_stats_tied_star_is_first_listed(pipeline, tied_feed):
+    _, team_dep = pipeline.fetch_player_stats(2025)
+    duke = team_dep.set_index("team").loc["Duke"]
+    assert duke["star_player"] == "First Star"
+    assert duke["star_player_usg"] == 25.0
+    assert duke["star_player_ppg"] == 18.0
+    assert duke["star_player_bpm"] == 4.0
+    assert duke["top2_dependency_pct"] == round((4.0 + 4.0) / (0.4 + 4.0 + 1.2 + 4.0) * 100, 1)
+
+
+def test_build_team_summary_uses_same_tie_rule(pipeline, tied_feed):
+    player_df, _ = pipeline.fetch_player_stats(2025)
+    injuries = pd.DataFrame({
+        "player": ["Second Star"], "injury_status": ["Out"],
+        "severity": [3], "injury_type": ["Knee"],
+    })
+    merged = pipeline.merge_injury_impact(player_df, injuries)
+    summary = pipeline.build_team_summary(merged, ["Duke", "Yale"]).set_index("team")
+    # The injured tied player is not the star, so the star is not flagged as injured
+    assert not summary.loc["Duke", "star_is_injured"]
+    assert summary.loc["Duke", "star_player"] == "First Star"
+    assert summary.loc["Duke", "n_out"] == 1
+
+    injuries["player"] = ["First Star"]
+    merged = pipeline.merge_injury_impact(player_df, injuries)
+    summary = pipeline.build_team_summary(merged, ["Duke", "Yale"]).set_index("team")
+    assert summary.loc["Duke", "star_is_injured"]
+    assert np.isclose(summary.loc["Duke", "star_injury_bpm"], 4.0)